@@ -0,0 +1,2 @@
+# -*- coding: utf-8 -*-
+"""Offline performance benchmarks, run with ``python -m benchmarks.run``."""
@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Measure rendering of many concurrent branches, where column lookups dominate.
+
+Every node is looked up among the columns for each of its parents,
+so with a linear scan rendering ``W`` side-by-side branches costs
+O(N·W²). To compare column lookup by index with the linear scan it
+replaced, run this against the current tree and against a checkout of
+the commit before lookups were indexed, e.g.::
+
+    python -m benchmarks.columns
+    git worktree add /tmp/old <commit before the change>
+    python -m benchmarks.columns --src /tmp/old/src
+"""
+
+# pylint: disable=bad-option-value,import-outside-toplevel
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import argparse
+import sys
+import timeit
+
+DEFAULT_WIDTHS = (100, 300, 1000)
+COMMITS_PER_BRANCH = 5
+
+
+def parse_args(argv):
+    """Parse the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--widths", type=int, nargs="+", default=DEFAULT_WIDTHS,
+                        help="numbers of concurrent branches (default: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement, best is kept")
+    parser.add_argument("--src", help="directory to import asciidag from instead of the installed one")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Render fans of branches of increasing width and report the best time for each."""
+    args = parse_args(argv)
+    if args.src:
+        sys.path.insert(0, args.src)
+    from asciidag.graph import Graph
+
+    from .generators import wide_fanout
+    from .run import NullWriter
+
+    print("{:>8} {:>8} {:>10}".format("branches", "nodes", "seconds"))
+    for width in args.widths:
+        size = width * COMMITS_PER_BRANCH + 1
+        tips = wide_fanout(size, width=width)
+        best = None
+        for _ in range(args.repeat):
+            start = timeit.default_timer()
+            Graph(fh=NullWriter(), use_color=False).show_nodes(tips)
+            elapsed = timeit.default_timer() - start
+            best = elapsed if best is None else min(best, elapsed)
+        print("{:>8} {:>8} {:>10.4f}".format(width, size, best))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""Generators of synthetic DAGs for benchmarking.
+
+Each generator builds its nodes iteratively, parents first, and
+returns the list of tips. ``size`` is the number of nodes to build
+(approximately, where the shape needs whole units). Only
+:func:`git_history` is random, and it is seeded.
+"""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import random
+
+from asciidag.node import Node
+
+
+def linear_chain(size):
+    """Build a single chain of nodes."""
+    node = Node("commit 0")
+    for i in range(1, size):
+        node = Node("commit {}".format(i), parents=[node])
+    return [node]
+
+
+def wide_fanout(size, width=64):
+    """Build ``width`` branches growing side by side from one root, one tip each."""
+    root = Node("root")
+    tips = [root] * width
+    for i in range(size - 1):
+        branch = i % width
+        tips[branch] = Node("branch {} commit {}".format(branch, i // width), parents=[tips[branch]])
+    return tips
+
+
+def octopus_merges(size, arity=4):
+    """Build a chain of octopus merges, each joining ``arity`` short branches."""
+    base = Node("root")
+    i = 1
+    while i < size:
+        heads = [Node("side {}".format(i + j), parents=[base]) for j in range(arity)]
+        base = Node("octopus {}".format(i), parents=heads)
+        i += arity + 1
+    return [base]
+
+
+def diamond_ladder(size, node_class=Node):
+    """Build a chain of diamonds, doubling the number of paths to the root at each rung.
+
+    Args:
+        size (:obj:`int`): number of nodes, three per rung plus the root.
+        node_class (:obj:`type`): class of the nodes, such as a subclass of Node that counts accesses.
+
+    """
+    bottom = node_class("root")
+    for i in range(max(0, size - 1) // 3):
+        left = node_class("left {}".format(i), parents=[bottom])
+        right = node_class("right {}".format(i), parents=[bottom])
+        bottom = node_class("merge {}".format(i), parents=[left, right])
+    return [bottom]
+
+
+def git_history(size, seed=0, merge_rate=0.2, branch_rate=0.1, max_branches=16):
+    """Build a git-like history of topic branches forking from and merging into a main line.
+
+    Args:
+        size (:obj:`int`): number of nodes.
+        seed (:obj:`int`): random seed.
+        merge_rate (:obj:`float`): chance that a main line commit merges a topic branch.
+        branch_rate (:obj:`float`): chance that a commit starts a new topic branch.
+        max_branches (:obj:`int`): maximum number of topic branches open at once.
+
+    """
+    rnd = random.Random(seed)
+    main = Node("main 0")
+    topics = []
+    for i in range(1, size):
+        if topics and rnd.random() < merge_rate:
+            topic = topics.pop(rnd.randrange(len(topics)))
+            main = Node("merge {}".format(i), parents=[main, topic])
+        elif len(topics) < max_branches and rnd.random() < branch_rate:
+            topics.append(Node("topic {}".format(i), parents=[main]))
+        elif topics and rnd.random() < 0.5:
+            j = rnd.randrange(len(topics))
+            topics[j] = Node("topic {}".format(i), parents=[topics[j]])
+        else:
+            main = Node("main {}".format(i), parents=[main])
+    return [main] + topics
+
+
+GENERATORS = {
+    "linear_chain": linear_chain,
+    "wide_fanout": wide_fanout,
+    "octopus_merges": octopus_merges,
+    "diamond_ladder": diamond_ladder,
+    "git_history": git_history,
+}
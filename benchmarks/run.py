@@ -0,0 +1,212 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Measure the scaling of rendering and ordering on synthetic DAGs.
+
+For every generator, size and benchmark, this records nodes per
+second, bytes per second (for rendering), time to the first line (for
+rendering) and peak traced memory, fits a scaling exponent to each
+curve, and saves the results as JSON so that runs from different
+versions can be compared with ``--compare``. Peak memory is only
+measured on Python 3.4+, which has tracemalloc.
+"""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import argparse
+import gc
+import io
+import json
+import math
+import platform
+import sys
+import timeit
+
+import asciidag
+from asciidag.graph import Graph
+from asciidag.sequence import walk_nodes, once, sort_in_topological_order
+
+from .generators import GENERATORS
+
+try:
+    import tracemalloc
+except ImportError:  # Python < 3.4
+    tracemalloc = None
+
+DEFAULT_SIZES = (1000, 4000, 16000)
+
+
+class NullWriter(object):  # pylint: disable=bad-option-value,useless-object-inheritance
+    """File-like object that counts and discards what is written."""
+
+    def __init__(self):
+        """Create a writer that has counted nothing."""
+        self.bytes = 0
+
+    def write(self, text):
+        """Count the encoded size of the text."""
+        self.bytes += len(text.encode("utf-8"))
+
+
+def bench_show_nodes(tips):
+    """Render the DAG, returning the number of bytes written."""
+    out = NullWriter()
+    Graph(fh=out).show_nodes(tips)
+    return out.bytes
+
+
+def bench_walk_nodes(tips):
+    """Walk the DAG."""
+    for _ in walk_nodes(tips):
+        pass
+
+
+def bench_once(tips):
+    """De-duplicate a sequence with every node twice."""
+    nodes = list(walk_nodes(tips))
+    for _ in once(nodes + nodes):
+        pass
+
+
+def bench_sort_in_topological_order(tips):
+    """Sort the walked DAG."""
+    for _ in sort_in_topological_order(list(walk_nodes(tips))):
+        pass
+
+
+BENCHMARKS = {
+    "show_nodes": bench_show_nodes,
+    "walk_nodes": bench_walk_nodes,
+    "once": bench_once,
+    "sort_in_topological_order": bench_sort_in_topological_order,
+}
+
+
+def time_to_first_line(tips):
+    """Return the seconds until the first rendered line is available."""
+    start = timeit.default_timer()
+    next(iter(Graph().iter_lines(tips)))
+    return timeit.default_timer() - start
+
+
+def peak_memory(function, tips):
+    """Return the peak traced memory in bytes while running the function, or None without tracemalloc."""
+    if tracemalloc is None:
+        return None
+    tracemalloc.start()
+    try:
+        function(tips)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def measure(name, generator, size, repeat):
+    """Measure one benchmark on one generated DAG."""
+    function = BENCHMARKS[name]
+    tips = GENERATORS[generator](size)
+    num_nodes = sum(1 for _ in walk_nodes(tips))
+
+    best = None
+    output_bytes = None
+    for _ in range(repeat):
+        gc.collect()
+        start = timeit.default_timer()
+        output_bytes = function(tips)
+        elapsed = timeit.default_timer() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    result = {
+        "benchmark": name,
+        "generator": generator,
+        "size": size,
+        "nodes": num_nodes,
+        "seconds": best,
+        "nodes_per_second": num_nodes / best if best else None,
+        "peak_memory_bytes": peak_memory(function, tips),
+    }
+    if output_bytes is not None:
+        result["bytes"] = output_bytes
+        result["bytes_per_second"] = output_bytes / best if best else None
+        result["time_to_first_line"] = time_to_first_line(tips)
+    return result
+
+
+def scaling_exponents(results):
+    """Fit time ~ nodes ** k between the smallest and largest size of each curve.
+
+    An exponent near 1 means linear scaling, near 2 quadratic.
+    """
+    curves = {}
+    for result in results:
+        curves.setdefault("{benchmark}/{generator}".format(**result), []).append(result)
+    exponents = {}
+    for curve, points in sorted(curves.items()):
+        points.sort(key=lambda result: result["nodes"])
+        first, last = points[0], points[-1]
+        if last["nodes"] > first["nodes"] and first["seconds"] and last["seconds"]:
+            exponents[curve] = (math.log(last["seconds"] / first["seconds"])
+                                / math.log(last["nodes"] / first["nodes"]))
+    return exponents
+
+
+def compare(old_results, new_results):
+    """Print the ratio of new to old time for every matching measurement."""
+    old = dict(((r["benchmark"], r["generator"], r["size"]), r) for r in old_results["results"])
+    print("{:<28} {:<16} {:>8} {:>10} {:>10} {:>7}".format("benchmark", "generator", "size", "old s", "new s", "ratio"))
+    for result in new_results["results"]:
+        previous = old.get((result["benchmark"], result["generator"], result["size"]))
+        if previous is None:
+            continue
+        print("{:<28} {:<16} {:>8} {:>10.4f} {:>10.4f} {:>7.2f}".format(
+            result["benchmark"], result["generator"], result["size"],
+            previous["seconds"], result["seconds"], result["seconds"] / previous["seconds"]))
+
+
+def parse_args(argv):
+    """Parse the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--benchmark", action="append", choices=sorted(BENCHMARKS),
+                        help="benchmark to run (default: all)")
+    parser.add_argument("--generator", action="append", choices=sorted(GENERATORS),
+                        help="DAG generator to use (default: all)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="numbers of nodes to generate (default: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement, best is kept")
+    parser.add_argument("--output", help="file to save the JSON results to")
+    parser.add_argument("--compare", help="JSON results of an earlier run to compare with")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Run the benchmarks and report the results."""
+    args = parse_args(argv)
+    # Older versions walk and build nodes recursively
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 100000))
+    results = {
+        "asciidag_version": asciidag.__version__,
+        "python_version": platform.python_version(),
+        "python_implementation": platform.python_implementation(),
+        "results": [],
+    }
+    for generator in args.generator or sorted(GENERATORS):
+        for size in args.sizes:
+            for name in args.benchmark or sorted(BENCHMARKS):
+                result = measure(name, generator, size, args.repeat)
+                results["results"].append(result)
+                print("{benchmark:<28} {generator:<16} {size:>8} {seconds:>10.4f}s "
+                      "{nodes_per_second:>12.0f} nodes/s {peak_memory_bytes!s:>12} B peak".format(**result))
+
+    results["scaling"] = scaling_exponents(results["results"])
+    for curve, exponent in sorted(results["scaling"].items()):
+        print("scaling {:<45} time ~ nodes ** {:.2f}".format(curve, exponent))
+
+    if args.output:
+        with io.open(args.output, "w", encoding="utf-8") as fh:
+            fh.write(json.dumps(results, indent=2, sort_keys=True))
+    if args.compare:
+        with io.open(args.compare, encoding="utf-8") as fh:
+            compare(json.load(fh), results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,2 @@
+# -*- coding: utf-8 -*-
+"""Put the repository root on the path, so that the tests can use the benchmark DAG generators."""
@@ -75,15 +75,21 @@ def main():
         setup_requires=[
             "pytest-runner",
         ],
-        install_requires=[
-            "enum34; python_version<'3.4'",
-        ],
+        install_requires=[],
         tests_require=tests_require,
         extras_require={
             "dev": tests_require + [
                 "bump2version",
                 "twine",
             ],
+            "numpy": [
+                "numpy",
+            ],
+        },
+        entry_points={
+            "console_scripts": [
+                "asciidag = asciidag.cli:main",
+            ],
         },
         license=metadata["license"],
         classifiers=[
@@ -0,0 +1,10 @@
+# -*- coding: utf-8 -*-
+"""Allow running the command-line entry point as ``python -m asciidag``."""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import sys
+
+from .cli import main
+
+sys.exit(main())
@@ -0,0 +1,336 @@
+# -*- coding: utf-8 -*-
+"""DAGs stored in compressed sparse row (CSR) arrays, for very large histories.
+
+An :class:`ArrayDAG` identifies nodes by their index and keeps the
+parents of all of them in two NumPy ``int32`` arrays: ``parents``
+lists the parent indices of node 0, then those of node 1 and so on,
+and node ``i``'s parents are ``parents[offsets[i]:offsets[i + 1]]``.
+Labels are kept apart, in any sequence indexed by node. A node then
+costs 4 bytes plus 4 per parent, rather than a Python object each.
+
+The walk, de-duplication and topological sort are done a whole level
+at a time with NumPy, and produce exactly the orders of
+:func:`~asciidag.sequence.walk_nodes`, :func:`~asciidag.sequence.once`
+and :func:`~asciidag.sequence.sort_in_topological_order`, so that an
+:class:`ArrayGraph` draws exactly what :class:`~asciidag.graph.Graph`
+draws for the same DAG made of nodes.
+
+NumPy is an optional dependency, only needed for this module.
+"""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+from array import array
+from itertools import islice
+
+import numpy as np
+
+from .graph import INDEX_TYPECODE, Graph
+from .sequence import _sort_in_key_order, walk_nodes
+
+__all__ = ('ArrayDAG', 'ArrayGraph')
+
+INDEX_DTYPE = np.int32
+
+# Levels of the walk and sort with fewer nodes than this are processed
+# node by node, since NumPy calls cost more than they save on them.
+BATCH_SIZE = 256
+
+
+class ArrayDAG(object):  # pylint: disable=bad-option-value,useless-object-inheritance
+    """A DAG of ``num_nodes`` nodes, identified by index, with parents in CSR arrays.
+
+    Attributes:
+        offsets     -- The start of the parents of each node in ``parents``,
+                       followed by the total number of edges.
+        parents     -- The parent indices of every node, in node order.
+        labels      -- The label of each node, as a sequence indexed by node.
+        order       -- The topological order of all the nodes from :meth:`tips`, if known.
+        generations -- The generation number of each node, if known.
+
+    """
+
+    def __init__(self, offsets, parents, labels, order=None, generations=None):
+        """Create a DAG from its arrays.
+
+        Args:
+            offsets (:obj:`numpy.ndarray`): ``num_nodes + 1`` offsets into ``parents``.
+            parents (:obj:`numpy.ndarray`): parent indices.
+            labels (:obj:`sequence`): label of each node.
+            order (:obj:`numpy.ndarray`): precomputed :meth:`topological_order` of
+                the :meth:`walk` from :meth:`tips`, if any.
+            generations (:obj:`numpy.ndarray`): precomputed :meth:`generation_numbers`, if any.
+        """
+        self.offsets = np.ascontiguousarray(offsets, dtype=INDEX_DTYPE)
+        self.parents = np.ascontiguousarray(parents, dtype=INDEX_DTYPE)
+        self.labels = labels
+        self.order = order
+        self.generations = generations
+        # Views give fast access to single elements from Python.
+        self._offsets_view = memoryview(self.offsets)
+        self._parents_view = memoryview(self.parents)
+
+    def __len__(self):
+        """Return the number of nodes."""
+        return len(self.offsets) - 1
+
+    @classmethod
+    def from_edges(cls, children, parents, labels):
+        """Create a DAG from parallel arrays of child and parent indices.
+
+        The parents of each node keep the order in which their edges
+        appear.
+
+        Args:
+            children (:obj:`numpy.ndarray`): the child index of each edge.
+            parents (:obj:`numpy.ndarray`): the parent index of each edge.
+            labels (:obj:`sequence`): label of each node, whose length is the number of nodes.
+
+        """
+        children = np.asarray(children, dtype=INDEX_DTYPE)
+        order = np.argsort(children, kind='stable')
+        offsets = np.zeros(len(labels) + 1, dtype=INDEX_DTYPE)
+        np.cumsum(np.bincount(children, minlength=len(labels)), out=offsets[1:])
+        return cls(offsets, np.asarray(parents, dtype=INDEX_DTYPE)[order], labels)
+
+    @classmethod
+    def from_nodes(cls, tips):
+        """Create a DAG from the nodes reachable from the tips.
+
+        Nodes are numbered in the order of :func:`walk_nodes`, so the
+        tips come first.
+
+        Returns:
+            :obj:`ArrayDAG`: with the nodes' items as labels.
+
+        """
+        nodes = list(walk_nodes(tips))
+        index = dict((node, i) for i, node in enumerate(nodes))
+        offsets = np.zeros(len(nodes) + 1, dtype=INDEX_DTYPE)
+        np.cumsum([len(node.parents) for node in nodes], out=offsets[1:])
+        parents = np.fromiter((index[parent] for node in nodes for parent in node.parents),
+                              dtype=INDEX_DTYPE, count=int(offsets[-1]))
+        return cls(offsets, parents, [node.item for node in nodes])
+
+    def parents_of(self, node, first_parent_only=False):
+        """Return the parent indices of a node, as a view of ``parents``."""
+        start = self._offsets_view[node]
+        end = self._offsets_view[node + 1]
+        if first_parent_only and end > start + 1:
+            end = start + 1
+        return self._parents_view[start:end]
+
+    def tips(self):
+        """Return the indices of the nodes that are no node's parent, in order."""
+        is_tip = np.ones(len(self), dtype=bool)
+        is_tip[self.parents] = False
+        return np.flatnonzero(is_tip).astype(INDEX_DTYPE)
+
+    def generation_numbers(self, order=None):
+        """Return the generation number of every node, as for :func:`~asciidag.sequence.generation_numbers`.
+
+        Args:
+            order (:obj:`numpy.ndarray`): topological order of all the nodes, computed if not given.
+
+        """
+        if order is None:
+            order = self.topological_order(self.walk(self.tips()))
+        generations = np.zeros(len(self), dtype=INDEX_DTYPE)
+        generations_view = memoryview(generations)
+        parents_of = self.parents_of
+        for node in reversed(memoryview(np.ascontiguousarray(order, dtype=INDEX_DTYPE)).tolist()):
+            generations_view[node] = 1 + max([generations_view[parent] for parent in parents_of(node)] or [0])
+        return generations
+
+    def gather_parents(self, nodes, first_parent_only=False):
+        """Return the parents of each of the nodes, concatenated in order."""
+        nodes = np.asarray(nodes, dtype=INDEX_DTYPE)
+        starts = self.offsets[nodes]
+        ends = self.offsets[nodes + 1]
+        if first_parent_only:
+            ends = np.minimum(ends, starts + 1)
+        counts = ends - starts
+        total = int(counts.sum())
+        if not total:
+            return np.empty(0, dtype=INDEX_DTYPE)
+        # Shift a single range by the start of each node's parents
+        # relative to where they land in the output.
+        shifts = np.repeat(starts - np.cumsum(counts) + counts, counts)
+        return self.parents[np.arange(total, dtype=INDEX_DTYPE) + shifts]
+
+    def walk(self, tips, first_parent_only=False):
+        """Return the nodes reachable from the tips, in the order of :func:`walk_nodes`.
+
+        Breadth-first order is built one level at a time: the parents
+        of a whole level are gathered, those already visited dropped,
+        and the rest de-duplicated in order. Levels narrower than
+        ``BATCH_SIZE``, as in long stretches of linear history, are
+        stepped through in Python instead, where NumPy's per-call
+        overhead would dominate.
+        """
+        visited = bytearray(len(self))
+        visited_mask = np.frombuffer(visited, dtype=bool)
+        parents_of = self.parents_of
+        order = array(INDEX_TYPECODE)
+        level = once(tips)
+        visited_mask[level] = True
+        while len(level):
+            if len(level) >= BATCH_SIZE:
+                _extend(order, level)
+                parents = self.gather_parents(level, first_parent_only)
+                level = once(parents[~visited_mask[parents]])
+                visited_mask[level] = True
+                continue
+
+            level = level.tolist() if isinstance(level, np.ndarray) else level
+            order.extend(level)
+            next_level = []
+            for node in level:
+                for parent in parents_of(node, first_parent_only):
+                    if not visited[parent]:
+                        visited[parent] = 1
+                        next_level.append(parent)
+            level = next_level
+        return np.frombuffer(order, dtype=INDEX_DTYPE)
+
+    def topological_order(self, nodes, first_parent_only=False):  # pylint: disable=too-many-locals
+        """Return the nodes in the order of :func:`sort_in_topological_order`.
+
+        This is Kahn's algorithm done a level at a time: the parents of
+        every node released in one level have their in-degree reduced
+        together, and those left with none are released next, in the
+        order of the edge that released them, as the node-by-node queue
+        would have done. As for :meth:`walk`, narrow levels are stepped
+        through in Python.
+
+        Args:
+            nodes (:obj:`numpy.ndarray`): distinct node indices, such as from :meth:`walk`.
+            first_parent_only (:obj:`bool`): only consider the edge to the first parent of each node.
+
+        """
+        nodes = np.asarray(nodes, dtype=INDEX_DTYPE)
+        in_set = bytearray(len(self))
+        in_set_mask = np.frombuffer(in_set, dtype=bool)
+        in_set_mask[nodes] = True
+        edges = self.gather_parents(nodes, first_parent_only)
+        in_degree = np.bincount(edges[in_set_mask[edges]], minlength=len(self)).astype(INDEX_DTYPE)
+        in_degree_view = memoryview(in_degree)
+
+        parents_of = self.parents_of
+        order = array(INDEX_TYPECODE)
+        level = nodes[in_degree[nodes] == 0]
+        while len(level):
+            if len(level) >= BATCH_SIZE:
+                _extend(order, level)
+                edges = self.gather_parents(level, first_parent_only)
+                edges = edges[in_set_mask[edges]]
+                # The last position of each parent is the edge that releases it.
+                parents, first_in_reverse, counts = np.unique(edges[::-1], return_index=True, return_counts=True)
+                in_degree[parents] -= counts.astype(INDEX_DTYPE)
+                released = in_degree[parents] == 0
+                level = parents[released][np.argsort(-first_in_reverse[released], kind='stable')]
+                continue
+
+            level = level.tolist() if isinstance(level, np.ndarray) else level
+            order.extend(level)
+            next_level = []
+            for node in level:
+                for parent in parents_of(node, first_parent_only):
+                    if in_set[parent]:
+                        remaining = in_degree_view[parent] - 1
+                        in_degree_view[parent] = remaining
+                        if not remaining:
+                            next_level.append(parent)
+            level = next_level
+        return np.frombuffer(order, dtype=INDEX_DTYPE)
+
+
+def _extend(order, level):
+    # Append a level of node indices to an array of the order.
+    data = np.asarray(level, dtype=INDEX_DTYPE).tobytes()
+    if hasattr(order, 'frombytes'):
+        order.frombytes(data)
+    else:  # Python 2
+        order.fromstring(data)
+
+
+def once(nodes):
+    """Return node indices with duplicates removed, keeping the first of each."""
+    nodes = np.asarray(nodes, dtype=INDEX_DTYPE)
+    _, first = np.unique(nodes, return_index=True)
+    return nodes[np.sort(first)]
+
+
+class ArrayGraph(Graph):
+    """A Graph which draws an :class:`ArrayDAG` straight from its arrays.
+
+    Nodes are the integer indices of the DAG, so the lines yielded by
+    :meth:`iter_lines` hold indices rather than Nodes, and tips are
+    given as indices. Only the columns currently drawn hold any Python
+    objects.
+    """
+
+    def __init__(self, dag, **kwargs):
+        """Create a state machine for drawing the given DAG.
+
+        Args:
+            dag (:obj:`ArrayDAG`): DAG to draw.
+            kwargs: as for :class:`Graph`.
+        """
+        self.dag = dag
+        super(ArrayGraph, self).__init__(**kwargs)
+
+    def iter_lines(self, tips=None, max_count=None, generations=None, key=None):
+        """Iterate over the lines of an ASCII DAG for the nodes provided.
+
+        As for :meth:`Graph.iter_lines`, except that the tips default to
+        every tip of the DAG, in which case the DAG's precomputed
+        order is used if it has one, without walking or sorting. A key
+        is given node indices.
+
+        Args:
+            tips (:obj:`list` of :obj:`int`): indices of the tips to display, or None for all of them.
+            max_count (:obj:`int`): stop after this many nodes.
+            generations (:obj:`dict`): ignored, as the array sort is not lazy.
+            key (:obj:`callable`): function of a node index to the value to order ready nodes by.
+
+        """
+        if tips is None:
+            if self.dag.order is not None and not self.first_parent_only and key is None:
+                nodes = iter(memoryview(self.dag.order))
+                if max_count is not None:
+                    nodes = islice(nodes, max_count)
+                return self.iter_sorted_lines(nodes)
+            tips = self.dag.tips()
+        return super(ArrayGraph, self).iter_lines(tips, max_count, generations, key)
+
+    def show_nodes(self, tips=None, max_count=None, generations=None, key=None):
+        """Show an ASCII DAG for the nodes provided, by default all of them, see :meth:`iter_lines`."""
+        self._write_lines(self.iter_lines(tips, max_count, generations, key))
+
+    def _walk(self, tips):
+        return self.dag.walk(tips, self.first_parent_only)
+
+    def _sort(self, nodes, key=None):
+        if key is not None:
+            parents_of = self.dag.parents_of
+            return _sort_in_key_order(memoryview(np.ascontiguousarray(nodes, dtype=INDEX_DTYPE)), key,
+                                      lambda node: parents_of(node, self.first_parent_only))
+        # Iterating over a view makes each index an int only as it is drawn.
+        return iter(memoryview(self.dag.topological_order(nodes, self.first_parent_only)))
+
+    def _incremental_sort(self, tips, generations):
+        # The level-synchronous sort is fast enough not to need to be lazy.
+        return self._sort(self._walk(tips))
+
+    def _interesting_parents(self):
+        return iter(self.dag.parents_of(self.commit, self.first_parent_only))
+
+    def _write_lines(self, lines):
+        write = self.outfile.write
+        labels = self.dag.labels
+        for prefix, node in lines:
+            if node is None:
+                write(prefix + '\n')
+            else:
+                write(prefix + labels[node] + '\n')
@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+"""Caching of rendered DAGs, keyed by their structure and the render options."""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import hashlib
+import io
+import os
+import struct
+import tempfile
+from collections import OrderedDict
+
+from .graph import Graph
+from .sequence import walk_nodes, sort_in_topological_order
+
+__all__ = ('RenderCache', 'fingerprint')
+
+FIELD_LENGTH = struct.Struct(str('>Q'))
+
+try:
+    _replace = os.replace
+except AttributeError:  # Python 2
+    def _replace(source, destination):
+        # os.rename() will not overwrite an existing file on Windows.
+        if os.name == 'nt' and os.path.exists(destination):
+            os.remove(destination)
+        os.rename(source, destination)
+
+
+def _update(digest, field):
+    # Prefix each field with its length, so that no two sequences of
+    # fields hash the same bytes.
+    digest.update(FIELD_LENGTH.pack(len(field)))
+    digest.update(field)
+
+
+def fingerprint(tips):
+    """Compute a structural hash of the DAG reachable from the tips.
+
+    Each node's item, as its type and its text, is hashed together
+    with the hashes of its parents, in order, as in a Merkle tree, so
+    two DAGs have the same fingerprint exactly when they have the same
+    items connected in the same way (and the tips are given in the
+    same order), barring SHA-1 collisions. This costs one walk
+    and sort of the DAG and one hash per node, a fraction of the cost
+    of rendering it.
+
+    Args:
+        tips (:obj:`list` of :obj:`Node`): tips of the DAG.
+
+    Returns:
+        :obj:`str`: hexadecimal digest.
+
+    """
+    tips = list(tips)
+    hashes = {}
+    for node in reversed(list(sort_in_topological_order(list(walk_nodes(tips))))):
+        item_type = type(node.item)
+        digest = hashlib.sha1()
+        _update(digest, '{}.{}'.format(item_type.__module__, item_type.__name__).encode('utf-8'))
+        _update(digest, '{}'.format(node.item).encode('utf-8'))
+        _update(digest, b''.join(hashes[parent] for parent in node.parents))
+        hashes[node] = digest.digest()
+    digest = hashlib.sha1()
+    _update(digest, b''.join(hashes[tip] for tip in tips))
+    return digest.hexdigest()
+
+
+class RenderCache(object):  # pylint: disable=too-many-instance-attributes,bad-option-value,useless-object-inheritance
+    """A cache of rendered DAGs with an in-memory LRU and an optional on-disk tier.
+
+    Entries are keyed by the :func:`fingerprint` of the DAG together
+    with the Graph options used to render it. Entries evicted from
+    memory stay on disk, if a directory is given, until the files in
+    it exceed ``max_disk_bytes``, when the least recently used are
+    removed.
+
+    Attributes:
+        maxsize        -- The number of renders to keep in memory.
+        directory      -- The directory of the on-disk tier, or None.
+        max_disk_bytes -- The total size of the on-disk tier.
+        hits           -- The number of renders found in memory.
+        disk_hits      -- The number of renders found on disk.
+        misses         -- The number of renders that had to be done.
+
+    """
+
+    def __init__(self, maxsize=128, directory=None, max_disk_bytes=64 * 1024 * 1024):
+        """Create an empty cache.
+
+        Args:
+            maxsize (:obj:`int`): number of renders to keep in memory.
+            directory (:obj:`str`): directory to keep renders in on disk, if any.
+            max_disk_bytes (:obj:`int`): total size of the files to keep on disk.
+        """
+        self.maxsize = maxsize
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._disk_bytes = 0
+        if directory is not None:
+            if not os.path.isdir(directory):
+                os.makedirs(directory)
+            self._disk_bytes = sum(size for _, _, size in self._disk_entries())
+
+    def info(self):
+        """Return the cache statistics as a dict."""
+        return {
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'size': len(self._memory),
+        }
+
+    def render(self, tips, first_parent_only=False, use_color=True, column_colors=None):
+        """Return the rendered text for the DAG, rendering it only on a miss.
+
+        Args:
+            tips (:obj:`list` of :obj:`Node`): tips of trees to display.
+            first_parent_only (:obj:`bool`): as for :class:`Graph`.
+            use_color (:obj:`bool`): as for :class:`Graph`.
+            column_colors (:obj:`list` of :obj:`str`): as for :class:`Graph`.
+
+        Returns:
+            :obj:`str`: the text :meth:`Graph.show_nodes` would write.
+
+        """
+        tips = list(tips)
+        options = (first_parent_only, use_color, None if column_colors is None else tuple(column_colors))
+        key = hashlib.sha1('{}{!r}'.format(fingerprint(tips), options).encode('utf-8')).hexdigest()
+
+        text = self._memory.pop(key, None)
+        if text is not None:
+            self.hits += 1
+        else:
+            text = self._read(key)
+            if text is not None:
+                self.disk_hits += 1
+            else:
+                self.misses += 1
+                out = io.StringIO()
+                Graph(fh=out, first_parent_only=first_parent_only, use_color=use_color,
+                      column_colors=column_colors).show_nodes(tips)
+                text = out.getvalue()
+                self._write(key, text)
+        self._memory[key] = text
+        while len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+        return text
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.txt')
+
+    def _read(self, key):
+        if self.directory is None:
+            return None
+        path = self._path(key)
+        try:
+            with io.open(path, encoding='utf-8', newline='') as fh:
+                text = fh.read()
+        except (IOError, OSError):
+            return None
+        os.utime(path, None)
+        return text
+
+    def _write(self, key, text):
+        if self.directory is None:
+            return
+        handle, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with io.open(handle, 'w', encoding='utf-8', newline='') as fh:
+            fh.write(text)
+        path = self._path(key)
+        if os.path.exists(path):
+            self._disk_bytes -= os.path.getsize(path)
+        self._disk_bytes += os.path.getsize(temp_path)
+        _replace(temp_path, path)
+        if self._disk_bytes > self.max_disk_bytes:
+            self._evict()
+
+    def _disk_entries(self):
+        # Yield the modification time, name and size of each cached file.
+        for name in os.listdir(self.directory):
+            if name.endswith('.txt'):
+                stat = os.stat(os.path.join(self.directory, name))
+                yield stat.st_mtime, name, stat.st_size
+
+    def _evict(self):
+        # The directory is scanned again, as other caches may share it.
+        entries = sorted(self._disk_entries())
+        total = sum(size for _, _, size in entries)
+        for _, name, size in entries:
+            if total <= self.max_disk_bytes:
+                break
+            os.remove(os.path.join(self.directory, name))
+            total -= size
+        self._disk_bytes = total
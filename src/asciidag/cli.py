@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=bad-option-value,import-outside-toplevel
+"""Command-line entry point for drawing DAGs from files or standard input.
+
+Modules are imported only once they are needed, so that the time to
+the first line of output stays low.
+"""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import argparse
+import errno
+import io
+import os
+import sys
+
+OUTPUT_BUFFER_SIZE = 1 << 16
+
+
+def _non_negative_int(text):
+    value = int(text)
+    if value < 0:
+        raise argparse.ArgumentTypeError("must not be negative: {}".format(text))
+    return value
+
+
+def _positive_int(text):
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError("must be positive: {}".format(text))
+    return value
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(
+        prog="asciidag",
+        description="Draw a DAG as ASCII art, à la git log --graph.")
+    parser.add_argument("input", nargs="?", default="-",
+                        help="file to read, or - for standard input (default: %(default)s)")
+    parser.add_argument("--format", choices=("parents", "json"), default="parents",
+                        help="'parents': lines of 'id parent-id...' as printed by git rev-list --parents; "
+                             "'json': an object mapping each id to a list of parent ids (default: %(default)s)")
+    parser.add_argument("--sorted", action="store_true",
+                        help="input is already in topological order (git rev-list --topo-order), "
+                             "so draw each node as soon as it is read")
+    parser.add_argument("--no-color", dest="use_color", action="store_false",
+                        help="do not color the branch lines")
+    parser.add_argument("--first-parent", action="store_true",
+                        help="follow only the first parent of each node")
+    parser.add_argument("--limit", type=_non_negative_int, metavar="N",
+                        help="stop after drawing N nodes")
+    parser.add_argument("--jobs", type=_positive_int, metavar="N",
+                        help="parse a 'parents' input file in chunks in N worker processes "
+                             "(not with standard input or --sorted)")
+    args = parser.parse_args(argv)
+    if args.jobs is not None:
+        if args.input == "-":
+            parser.error("--jobs needs an input file, not standard input")
+        if args.sorted or args.format != "parents":
+            parser.error("--jobs only applies to unsorted 'parents' input")
+    return args
+
+
+def _open_input(path):
+    if path == "-":
+        return io.open(sys.stdin.fileno(), "rb", closefd=False)
+    return io.open(path, "rb")
+
+
+def _open_output():
+    buffering = 1 if sys.stdout.isatty() else OUTPUT_BUFFER_SIZE
+    return io.open(sys.stdout.fileno(), "w", encoding="utf-8", buffering=buffering, closefd=False)
+
+
+def _tips(nodes):
+    parents = set()
+    for node in nodes:
+        parents.update(node.parents)
+    return [node for node in nodes if node not in parents]
+
+
+def _read_nodes(args, infile):
+    if args.format == "json":
+        import json
+        from .node import Node
+        return _tips(list(Node.from_adjacency(json.loads(infile.read().decode("utf-8"))).values()))
+    if args.sorted:
+        from .loader import stream
+        return stream(infile)
+    if args.jobs is not None:
+        from .edgelist import parse_edges
+        return _tips(list(parse_edges(args.input, args.jobs).nodes().values()))
+    from .loader import load
+    return _tips(list(load(infile).values()))
+
+
+def _first_parent_history(nodes):
+    # Keep the nodes of a topologically ordered stream which a
+    # first-parent walk from its tips reaches: the tips, which no
+    # earlier node has as a parent, and the first parents of the nodes
+    # kept. Only parents still to come are remembered.
+    mentioned = set()
+    wanted = set()
+    for node in nodes:
+        if node in wanted or node not in mentioned:
+            yield node
+            wanted.update(node.parents[:1])
+        wanted.discard(node)
+        mentioned.discard(node)
+        mentioned.update(node.parents)
+
+
+def _sort_nodes(args, nodes):
+    if args.sorted and args.format == "parents":
+        if args.first_parent:
+            return _first_parent_history(nodes)
+        return nodes
+    from .sequence import walk_nodes, sort_in_topological_order
+    nodes = list(walk_nodes(nodes, args.first_parent))
+    return sort_in_topological_order(nodes, args.first_parent)
+
+
+def main(argv=None):
+    """Draw the DAG described by a file or standard input.
+
+    Args:
+        argv (:obj:`list` of :obj:`str`): command-line arguments, defaulting to ``sys.argv[1:]``.
+
+    Returns:
+        :obj:`int`: exit status.
+
+    """
+    args = _parse_args(argv)
+
+    from itertools import islice
+    from .graph import Graph
+
+    outfile = _open_output()
+    try:
+        with _open_input(args.input) as infile:
+            nodes = _sort_nodes(args, _read_nodes(args, infile))
+            if args.limit is not None:
+                nodes = islice(nodes, args.limit)
+            graph = Graph(fh=outfile, first_parent_only=args.first_parent, use_color=args.use_color)
+            graph.show_sorted_nodes(nodes)
+        outfile.close()
+    except IOError as error:
+        if error.errno != errno.EPIPE:
+            raise
+        # The reader went away (e.g. piped into head): discard whatever
+        # is still buffered rather than failing again on exit.
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        outfile.close()
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
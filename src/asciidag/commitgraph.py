@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+"""Loading of DAGs straight from Git's commit-graph files.
+
+Git keeps the parents and generation numbers of the commits in a
+repository in ``objects/info/commit-graph``, or in a chain of files
+under ``objects/info/commit-graphs`` when written with ``--split``.
+These are read here through memory maps, so that a repository's
+history can be drawn without running ``git log`` or parsing any text.
+
+Only what drawing needs is read: the commit ids (OIDL chunk), their
+parents and generation numbers (CDAT chunk), and the extra parents of
+octopus merges (EDGE chunk). See Git's
+``Documentation/technical/commit-graph-format.txt`` for the format.
+"""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import binascii
+import io
+import mmap
+import os
+import struct
+
+from .node import Node
+
+__all__ = ('CommitGraph', 'InvalidCommitGraphException')
+
+SIGNATURE = b'CGPH'
+HASH_SIZES = {1: 20, 2: 32}
+
+CHUNK_OID_FANOUT = b'OIDF'
+CHUNK_OID_LOOKUP = b'OIDL'
+CHUNK_COMMIT_DATA = b'CDAT'
+CHUNK_EXTRA_EDGES = b'EDGE'
+
+PARENT_NONE = 0x70000000
+PARENT_EXTRA_EDGES = 0x80000000
+EDGE_LAST = 0x80000000
+GENERATION_SHIFT = 2
+
+HEADER = struct.Struct(str('>4sBBBB'))
+CHUNK_ENTRY = struct.Struct(str('>4sQ'))
+UINT32 = struct.Struct(str('>I'))
+PARENTS_AND_DATE = struct.Struct(str('>IIII'))
+
+
+class InvalidCommitGraphException(Exception):
+    """Indicates a missing or unreadable commit-graph."""
+
+
+class _CommitGraphFile(object):  # pylint: disable=too-many-instance-attributes,useless-object-inheritance
+    """A single mapped commit-graph file, one layer of a chain."""
+
+    def __init__(self, path, base_count):
+        with io.open(path, 'rb') as fh:
+            # Checked before mapping, as an empty file cannot be mapped.
+            if os.fstat(fh.fileno()).st_size < HEADER.size:
+                raise InvalidCommitGraphException('{} is truncated'.format(path))
+            self.map = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        self.base_count = base_count
+        try:
+            self._parse_header(path)
+        except InvalidCommitGraphException:
+            self.map.close()
+            raise
+        except struct.error:
+            self.map.close()
+            # pylint: disable=bad-option-value,raise-missing-from
+            raise InvalidCommitGraphException('{} is truncated'.format(path))
+
+    def _parse_header(self, path):
+        signature, version, hash_version, num_chunks, _ = HEADER.unpack_from(self.map)
+        if signature != SIGNATURE or version != 1 or hash_version not in HASH_SIZES:
+            raise InvalidCommitGraphException('{} is not a commit-graph this version can read'.format(path))
+        self.hash_size = HASH_SIZES[hash_version]
+
+        chunks = {}
+        for i in range(num_chunks):
+            chunk_id, offset = CHUNK_ENTRY.unpack_from(self.map, HEADER.size + i * CHUNK_ENTRY.size)
+            chunks[chunk_id] = offset
+        for required in (CHUNK_OID_FANOUT, CHUNK_OID_LOOKUP, CHUNK_COMMIT_DATA):
+            if required not in chunks:
+                raise InvalidCommitGraphException('{} has no {} chunk'.format(path, required.decode('ascii')))
+        self.fanout = chunks[CHUNK_OID_FANOUT]
+        self.oid_lookup = chunks[CHUNK_OID_LOOKUP]
+        self.commit_data = chunks[CHUNK_COMMIT_DATA]
+        self.extra_edges = chunks.get(CHUNK_EXTRA_EDGES)
+        self.count = UINT32.unpack_from(self.map, self.fanout + 255 * 4)[0]
+
+    def oid(self, local):
+        """Return the binary id of the commit at a position in this file."""
+        start = self.oid_lookup + local * self.hash_size
+        return self.map[start:start + self.hash_size]
+
+    def find(self, oid):
+        """Return the position in this file of a binary id, using the fanout table."""
+        first_byte = bytearray(oid[:1])[0]
+        low = UINT32.unpack_from(self.map, self.fanout + (first_byte - 1) * 4)[0] if first_byte else 0
+        high = UINT32.unpack_from(self.map, self.fanout + first_byte * 4)[0]
+        while low < high:
+            middle = (low + high) // 2
+            found = self.oid(middle)
+            if found == oid:
+                return middle
+            if found < oid:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def parents_and_generation(self, local):
+        """Return the parent positions and generation number of the commit at a position in this file."""
+        offset = self.commit_data + local * (self.hash_size + 16) + self.hash_size
+        parent1, parent2, generation_and_date, _ = PARENTS_AND_DATE.unpack_from(self.map, offset)
+        parents = []
+        if parent1 != PARENT_NONE:
+            parents.append(parent1)
+        if parent2 & PARENT_EXTRA_EDGES:
+            edge = self.extra_edges + (parent2 & ~PARENT_EXTRA_EDGES) * 4
+            while True:
+                parent = UINT32.unpack_from(self.map, edge)[0]
+                parents.append(parent & ~EDGE_LAST)
+                if parent & EDGE_LAST:
+                    break
+                edge += 4
+        elif parent2 != PARENT_NONE:
+            parents.append(parent2)
+        return parents, generation_and_date >> GENERATION_SHIFT
+
+    def close(self):
+        """Unmap the file."""
+        self.map.close()
+
+
+class CommitGraph(object):  # pylint: disable=bad-option-value,useless-object-inheritance
+    """The commit-graph of a Git repository, mapped into memory.
+
+    Commits are identified by their position: the commits of the base
+    layer of a chain in id order, followed by those of each layer on
+    top of it. Generation numbers are Git's topological levels, which
+    are defined as for :func:`~asciidag.sequence.generation_numbers`.
+
+    Attributes:
+        layers -- The mapped files, base first.
+
+    """
+
+    def __init__(self, git_dir):
+        """Map the commit-graph of a repository.
+
+        Args:
+            git_dir (:obj:`str`): the ``.git`` directory, or a working tree containing one.
+
+        Raises:
+            InvalidCommitGraphException: if there is no commit-graph or it cannot be read.
+        """
+        if os.path.isdir(os.path.join(git_dir, '.git')):
+            git_dir = os.path.join(git_dir, '.git')
+        info = os.path.join(git_dir, 'objects', 'info')
+        single = os.path.join(info, 'commit-graph')
+        chain = os.path.join(info, 'commit-graphs', 'commit-graph-chain')
+        if os.path.exists(single):
+            paths = [single]
+        elif os.path.exists(chain):
+            with io.open(chain, encoding='ascii') as fh:
+                paths = [os.path.join(info, 'commit-graphs', 'graph-{}.graph'.format(line.strip()))
+                         for line in fh if line.strip()]
+        else:
+            raise InvalidCommitGraphException('{} has no commit-graph; run git commit-graph write'.format(git_dir))
+
+        self.layers = []
+        try:
+            for path in paths:
+                self.layers.append(_CommitGraphFile(path, len(self)))
+        except Exception:
+            self.close()
+            raise
+
+    def __len__(self):
+        """Return the number of commits in every layer."""
+        return sum(layer.count for layer in self.layers)
+
+    def _layer(self, position):
+        for layer in reversed(self.layers):
+            if position >= layer.base_count:
+                return layer, position - layer.base_count
+        raise IndexError(position)
+
+    def oid(self, position):
+        """Return the hexadecimal id of the commit at a position."""
+        layer, local = self._layer(position)
+        return binascii.hexlify(layer.oid(local)).decode('ascii')
+
+    def position(self, oid):
+        """Return the position of a commit given its hexadecimal id, or None if it is not in the graph."""
+        raw = binascii.unhexlify(oid)
+        for layer in self.layers:
+            local = layer.find(raw)
+            if local is not None:
+                return layer.base_count + local
+        return None
+
+    def parents(self, position):
+        """Return the positions of the parents of the commit at a position."""
+        layer, local = self._layer(position)
+        return layer.parents_and_generation(local)[0]
+
+    def generation(self, position):
+        """Return the generation number of the commit at a position (0 if not computed)."""
+        layer, local = self._layer(position)
+        return layer.parents_and_generation(local)[1]
+
+    def load(self, labels=None):
+        """Build a node for every commit, sharing them between children.
+
+        Args:
+            labels (:obj:`dict`): mapping of hexadecimal id to the item to show for that commit.
+
+        Returns:
+            :obj:`tuple`: a :obj:`dict` of hexadecimal id to Node, in
+            order of position, and a :obj:`dict` of Node to generation
+            number for :meth:`Graph.show_nodes`, or None if the
+            commit-graph was written without generation numbers.
+
+        """
+        if labels is None:
+            labels = {}
+        oids = []
+        nodes = []
+        parents = []
+        generations = []
+        for layer in self.layers:
+            for local in range(layer.count):
+                oid = binascii.hexlify(layer.oid(local)).decode('ascii')
+                oids.append(oid)
+                nodes.append(Node(labels.get(oid, oid)))
+                commit_parents, generation = layer.parents_and_generation(local)
+                parents.append(commit_parents)
+                generations.append(generation)
+        for node, commit_parents in zip(nodes, parents):
+            node.parents = tuple(nodes[parent] for parent in commit_parents)
+
+        by_oid = dict(zip(oids, nodes))
+        if not all(generations):
+            return by_oid, None
+        return by_oid, dict(zip(nodes, generations))
+
+    def close(self):
+        """Unmap every layer."""
+        for layer in self.layers:
+            layer.close()
+        self.layers = []
+
+    def __enter__(self):
+        """Return the mapped commit-graph."""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Unmap every layer."""
+        self.close()
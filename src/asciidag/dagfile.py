@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+"""A compact binary file format for DAGs, read through a memory map.
+
+Parsing text history on every start is slow for large DAGs. A DAG
+file holds everything an :class:`~asciidag.arraydag.ArrayGraph` needs,
+already laid out as arrays, so that opening one only maps it: the
+arrays are NumPy views of the mapped pages rather than copies, and
+several processes opening the same file share those pages.
+
+The file is little-endian and consists of a header followed by
+sections, each starting at a multiple of 8 bytes:
+
+=================  ==========================  ===========================================
+Section            Type                        Contents
+=================  ==========================  ===========================================
+header             ``<4sIQQQ``                 magic ``ADAG``, version, number of nodes,
+                                               number of edges, size of the label blob
+offsets            ``int32[num_nodes + 1]``    CSR offsets of each node's parents
+parents            ``int32[num_edges]``        CSR parent indices
+order              ``int32[num_nodes]``        topological order of all the nodes
+generations        ``int32[num_nodes]``        generation number of each node
+label offsets      ``int64[num_nodes + 1]``    offsets of each label in the blob
+label blob         ``bytes``                   UTF-8 labels, one after another
+=================  ==========================  ===========================================
+
+NumPy is required, as for :mod:`asciidag.arraydag`.
+"""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import io
+import mmap
+import os
+import struct
+
+import numpy as np
+
+from .arraydag import INDEX_DTYPE, ArrayDAG
+
+__all__ = ('DagFile', 'InvalidDagFileException', 'LabelStore', 'write_dagfile')
+
+MAGIC = b'ADAG'
+VERSION = 1
+HEADER = struct.Struct(str('<4sIQQQ'))
+ALIGNMENT = 8
+
+INDEX_FORMAT = np.dtype('<i4')
+LABEL_OFFSET_FORMAT = np.dtype('<i8')
+
+
+class InvalidDagFileException(Exception):
+    """Indicates a file which is not a DAG file this version can read."""
+
+
+def _sections(num_nodes, num_edges, label_bytes):
+    # Yield the name, offset, dtype and length of each section in order.
+    offset = HEADER.size
+    for name, dtype, length in (
+            ('offsets', INDEX_FORMAT, num_nodes + 1),
+            ('parents', INDEX_FORMAT, num_edges),
+            ('order', INDEX_FORMAT, num_nodes),
+            ('generations', INDEX_FORMAT, num_nodes),
+            ('label_offsets', LABEL_OFFSET_FORMAT, num_nodes + 1),
+            ('labels', np.dtype('u1'), label_bytes)):
+        offset += -offset % ALIGNMENT
+        yield name, offset, dtype, length
+        offset += dtype.itemsize * length
+
+
+def _encode(label):
+    # Labels which are already bytes are taken to be UTF-8; anything
+    # else is formatted as text, which str() cannot do for non-ASCII
+    # text on Python 2.
+    if isinstance(label, bytes):
+        return label
+    return '{}'.format(label).encode('utf-8')
+
+
+def write_dagfile(path, dag):
+    """Write a DAG to a file, computing its topological order and generations.
+
+    Args:
+        path (:obj:`str`): path of the file to write.
+        dag (:obj:`ArrayDAG`): DAG to write.
+
+    """
+    order = dag.order
+    if order is None:
+        order = dag.topological_order(dag.walk(dag.tips()))
+    generations = dag.generations
+    if generations is None:
+        generations = dag.generation_numbers(order)
+    encoded = [_encode(label) for label in dag.labels]
+    label_offsets = np.zeros(len(encoded) + 1, dtype=LABEL_OFFSET_FORMAT)
+    np.cumsum([len(label) for label in encoded], out=label_offsets[1:])
+
+    arrays = {
+        'offsets': dag.offsets,
+        'parents': dag.parents,
+        'order': order,
+        'generations': generations,
+        'label_offsets': label_offsets,
+    }
+    with io.open(path, 'wb') as fh:
+        fh.write(HEADER.pack(MAGIC, VERSION, len(dag), len(dag.parents), int(label_offsets[-1])))
+        for name, offset, dtype, _ in _sections(len(dag), len(dag.parents), int(label_offsets[-1])):
+            fh.write(b'\0' * (offset - fh.tell()))
+            if name == 'labels':
+                for label in encoded:
+                    fh.write(label)
+            else:
+                fh.write(np.asarray(arrays[name], dtype=dtype).tobytes())
+
+
+class LabelStore(object):  # pylint: disable=bad-option-value,useless-object-inheritance
+    """A sequence of labels decoded on demand from a blob and a table of offsets.
+
+    Attributes:
+        blob    -- The UTF-8 labels, one after another.
+        offsets -- The offset of each label in the blob, followed by the size of the blob.
+
+    """
+
+    def __init__(self, blob, offsets):
+        """Create a store over a blob.
+
+        Args:
+            blob (:obj:`memoryview`): the labels.
+            offsets (:obj:`numpy.ndarray`): ``len(labels) + 1`` offsets into the blob.
+        """
+        self.blob = blob
+        self.offsets = offsets
+        self._offsets_view = memoryview(np.ascontiguousarray(offsets, dtype=np.int64))
+
+    def __len__(self):
+        """Return the number of labels."""
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        """Return the label at the index."""
+        return self.blob[self._offsets_view[index]:self._offsets_view[index + 1]].tobytes().decode('utf-8')
+
+
+class DagFile(object):  # pylint: disable=bad-option-value,useless-object-inheritance
+    """A DAG file mapped into memory.
+
+    The DAG, with its precomputed order and generations, can be drawn
+    by passing it to an :class:`~asciidag.arraydag.ArrayGraph` and
+    calling :meth:`~asciidag.arraydag.ArrayGraph.show_nodes` without
+    tips. The file stays mapped until :meth:`close` is called, or the
+    end of a ``with`` block, after which the DAG must not be used.
+
+    A mapping cannot be closed while arrays of the DAG are still
+    referenced (for example by a variable holding ``dag.offsets``).
+    Closing then leaves the file mapped until they are garbage
+    collected, and :meth:`close` returns False to say so.
+
+    Attributes:
+        dag -- The :obj:`ArrayDAG` whose arrays are views of the mapped file.
+
+    """
+
+    def __init__(self, path):
+        """Map a DAG file, checking its header.
+
+        Args:
+            path (:obj:`str`): path of the file to read.
+
+        Raises:
+            InvalidDagFileException: if the file is not a DAG file of this version.
+        """
+        with io.open(path, 'rb') as fh:
+            # Checked before mapping, as an empty file cannot be mapped.
+            if os.fstat(fh.fileno()).st_size < HEADER.size:
+                raise InvalidDagFileException('file is too short for a header')
+            self._map = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self.dag = self._read()
+        except Exception:
+            self._map.close()
+            raise
+
+    def _read(self):
+        magic, version, num_nodes, num_edges, label_bytes = HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            raise InvalidDagFileException('not a DAG file')
+        if version != VERSION:
+            raise InvalidDagFileException('unsupported version {}'.format(version))
+
+        layout = list(_sections(num_nodes, num_edges, label_bytes))
+        for name, offset, dtype, length in layout:
+            if offset + dtype.itemsize * length > len(self._map):
+                raise InvalidDagFileException('file is truncated in section {}'.format(name))
+
+        # Views are only taken once the file is known to be valid, as
+        # the map cannot be closed while any exist.
+        buffer = memoryview(self._map)
+        sections = {}
+        for name, offset, dtype, length in layout:
+            end = offset + dtype.itemsize * length
+            if name == 'labels':
+                sections[name] = buffer[offset:end]
+            else:
+                # A no-op on little-endian machines, a copy on others.
+                sections[name] = np.frombuffer(buffer, dtype=dtype, count=length, offset=offset).astype(
+                    INDEX_DTYPE if dtype == INDEX_FORMAT else np.int64, copy=False)
+        return ArrayDAG(sections['offsets'], sections['parents'],
+                        LabelStore(sections['labels'], sections['label_offsets']),
+                        order=sections['order'], generations=sections['generations'])
+
+    def close(self):
+        """Unmap the file, unless arrays of the DAG are still referenced elsewhere.
+
+        In that case the mapping is released once they are garbage
+        collected instead.
+
+        Returns:
+            :obj:`bool`: whether the file was unmapped now.
+
+        """
+        self.dag = None
+        try:
+            self._map.close()
+        except BufferError:
+            return False
+        return True
+
+    def __enter__(self):
+        """Return the mapped file."""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Unmap the file, if nothing still references the DAG's arrays, see :meth:`close`."""
+        self.close()
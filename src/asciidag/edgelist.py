@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""Parallel parsing of large ``child parent...`` edge lists.
+
+For files of several gigabytes, splitting lines and interning ids is
+the slow part of loading. Here the file is cut into chunks at line
+boundaries and each chunk is parsed by a worker process into its own
+table of ids and edges between them, numbered locally. The chunk
+tables are then merged, in file order, into a single table of ids
+and a table of parent edges, which can become nodes for
+:class:`~asciidag.graph.Graph` or an
+:class:`~asciidag.arraydag.ArrayDAG`.
+
+The lines are those read by :mod:`asciidag.loader`, and each id is
+expected to have at most one line of its own.
+"""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import io
+import mmap
+import os
+from array import array
+from collections import namedtuple
+from contextlib import closing
+from multiprocessing import Pool
+
+from .graph import INDEX_TYPECODE
+from .node import Node
+
+__all__ = ('EdgeTable', 'parse_edges')
+
+DEFAULT_CHUNK_BYTES = 32 * 1024 * 1024
+
+
+class EdgeTable(namedtuple('EdgeTable', ('ids', 'children', 'parents'))):
+    """Ids and the parent edges between them, by index.
+
+    Attributes:
+        ids      -- The ids, in order of first appearance in the file.
+        children -- The index of the child of each edge, as an ``array``.
+        parents  -- The index of the parent of each edge, as an ``array``.
+
+    """
+
+    __slots__ = ()
+
+    def nodes(self, labels=None):
+        """Build a node for every id, as :func:`asciidag.loader.load` does.
+
+        Args:
+            labels (:obj:`dict`): mapping of id to the item to show for that node.
+
+        Returns:
+            :obj:`dict` of id to Node, in order of first appearance.
+
+        """
+        if labels is None:
+            labels = {}
+        nodes = [Node(labels.get(node_id, node_id)) for node_id in self.ids]
+        parents = [[] for _ in nodes]
+        for child, parent in zip(self.children, self.parents):
+            parents[child].append(nodes[parent])
+        for node, node_parents in zip(nodes, parents):
+            node.parents = tuple(node_parents)
+        return dict(zip(self.ids, nodes))
+
+    def array_dag(self):
+        """Build an :class:`~asciidag.arraydag.ArrayDAG` labelled with the ids (requires NumPy)."""
+        from .arraydag import ArrayDAG  # pylint: disable=bad-option-value,import-outside-toplevel
+        return ArrayDAG.from_edges(self.children, self.parents, self.ids)
+
+
+def _parse_chunk(task):
+    # Parse the lines in a byte range of the file into local tables.
+    path, start, end = task
+    with io.open(path, 'rb') as fh:
+        fh.seek(start)
+        text = fh.read(end - start).decode('utf-8')
+    ids = []
+    children = array(INDEX_TYPECODE)
+    parents = array(INDEX_TYPECODE)
+    intern = _interner(ids)
+    # Lines end only at newlines, as for the loader; splitlines() would
+    # also end them at form feeds and other separators.
+    for line in text.split('\n'):
+        local = [intern(node_id) for node_id in line.split()]
+        if local:
+            children.extend([local[0]] * (len(local) - 1))
+            parents.extend(local[1:])
+    return ids, children, parents
+
+
+def _interner(ids):
+    # Return a function numbering each id by its first appearance in ids.
+    index = {}
+
+    def intern(node_id):
+        i = index.get(node_id)
+        if i is None:
+            i = index[node_id] = len(ids)
+            ids.append(node_id)
+        return i
+    return intern
+
+
+def _chunk_boundaries(path, chunk_bytes):
+    size = os.path.getsize(path)
+    boundaries = [0]
+    if size:
+        with io.open(path, 'rb') as fh:
+            mapped = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                while boundaries[-1] + chunk_bytes < size:
+                    newline = mapped.find(b'\n', boundaries[-1] + chunk_bytes)
+                    if newline < 0:
+                        break
+                    boundaries.append(newline + 1)
+            finally:
+                mapped.close()
+    if boundaries[-1] < size:
+        boundaries.append(size)
+    return boundaries
+
+
+def parse_edges(path, processes=None, chunk_bytes=DEFAULT_CHUNK_BYTES):
+    """Parse an edge list file into an :class:`EdgeTable`, in parallel.
+
+    Args:
+        path (:obj:`str`): path of a file of ``id parent-id...`` lines.
+        processes (:obj:`int`): number of worker processes, defaulting to the
+            number of CPUs; with 1, or a single chunk, everything is done in-process.
+        chunk_bytes (:obj:`int`): approximate size of the chunk given to each worker.
+
+    Returns:
+        :obj:`EdgeTable`: the ids and edges of the whole file.
+
+    """
+    boundaries = _chunk_boundaries(path, chunk_bytes)
+    tasks = [(path, start, end) for start, end in zip(boundaries, boundaries[1:])]
+    if processes == 1 or len(tasks) < 2:
+        chunks = map(_parse_chunk, tasks)
+        return _merge(chunks)
+    with closing(Pool(processes)) as pool:
+        try:
+            return _merge(pool.imap(_parse_chunk, tasks))
+        finally:
+            pool.terminate()
+            pool.join()
+
+
+def _merge(chunks):
+    # Renumber the ids of each chunk into one table, keeping the order
+    # of first appearance, and the edges to match.
+    ids = []
+    intern = _interner(ids)
+    children = array(INDEX_TYPECODE)
+    parents = array(INDEX_TYPECODE)
+    for chunk_ids, chunk_children, chunk_parents in chunks:
+        renumber = [intern(node_id) for node_id in chunk_ids]
+        children.extend(map(renumber.__getitem__, chunk_children))
+        parents.extend(map(renumber.__getitem__, chunk_parents))
+    return EdgeTable(ids, children, parents)
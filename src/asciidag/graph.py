@@ -4,41 +4,37 @@
 This is almost a straight port of Git's graph.c.
 """
 
+# The state machine and the ways of driving it share the Graph's state,
+# so they are kept together in this module.
+# pylint: disable=too-many-lines
+
 from __future__ import absolute_import, division, print_function, unicode_literals
 
 import sys
-from enum import Enum
+from array import array
+from collections import namedtuple
+from itertools import islice
 
 from .color import COLUMN_COLORS_ANSI
-from .sequence import walk_nodes, once, sort_in_topological_order
+from .sequence import walk_nodes, sort_in_topological_order, incremental_topological_order
+from .state import Column, GraphState, LineBuilder
 
 __all__ = ('Graph',)
 
-
-class Column(object):  # pylint: disable=bad-option-value,useless-object-inheritance
-    """A single column of output.
-
-    Attributes:
-        commit -- The parent commit of this column.
-        color  -- The color to (optionally) print this column in.
-                  This is an index into column_colors.
-
-    """
-
-    def __init__(self, commit, color):
-        self.commit = commit
-        self.color = color
+# The array type code of column and node indices, shared with
+# asciidag.arraydag and asciidag.edgelist. array() rejects unicode type
+# codes on Python 2.
+INDEX_TYPECODE = str('i')
 
 
-class GraphState(Enum):
-    """The current state of the state machine."""
+GraphSnapshot = namedtuple('GraphSnapshot', (
+    'commit', 'num_parents', 'width', 'expansion_row', 'state', 'prev_state', 'commit_index',
+    'prev_commit_index', 'default_column_color', 'columns', 'new_columns', 'mapping'))
+GraphSnapshot.__doc__ = """The complete state of a Graph between two lines of output.
 
-    PADDING = 0
-    SKIP = 1
-    PRE_COMMIT = 2
-    COMMIT = 3
-    POST_MERGE = 4
-    COLLAPSING = 5
+Columns are stored as tuples of ``(commit, color)`` pairs and the
+mapping as a compact array, so that snapshots can be kept cheaply.
+"""
 
 
 # The commit currently being processed
@@ -118,6 +114,14 @@ class GraphState(Enum):
 # temporary array each time we have to output a collapsing line.
 #         int *new_mapping
 #
+# Maps each commit in columns to its index, so that columns can be
+# looked up without scanning them. Swapped with new_column_index
+# whenever columns is swapped with new_columns.
+#         column_index
+#
+# Maps each commit in new_columns to its index.
+#         new_column_index
+#
 # The current default column color being used. This is
 # stored as an index into the array column_colors.
 #         unsigned short default_column_color
@@ -128,7 +132,8 @@ class Graph(object):  # pylint: disable=too-many-instance-attributes,bad-option-
                  fh=None,
                  first_parent_only=False,
                  use_color=True,
-                 column_colors=None):
+                 column_colors=None,
+                 stats=False):
         """Create a state machine for parsing and displaying graph nodes.
 
         Args:
@@ -136,9 +141,10 @@ class Graph(object):  # pylint: disable=too-many-instance-attributes,bad-option-
             first_parent_only (:obj:`bool): display graph as if each node only had its first parent.
             use_color (:obj:`bool`): whether to use colored output.
             column_colors (:obj:`list` of :obj:`str`): list of ANSI control sequences to use for each lineage "column".
+            stats (:obj:`bool`): whether to collect statistics in ``self.stats``,
+                see :class:`~asciidag.stats.GraphStats`.
         """
         self.commit = None
-        self.buf = ''
 
         if fh is None:
             self.outfile = sys.stdout
@@ -150,6 +156,7 @@ class Graph(object):  # pylint: disable=too-many-instance-attributes,bad-option-
             self.column_colors = COLUMN_COLORS_ANSI
         else:
             self.column_colors = column_colors
+        self.buf = LineBuilder(self.column_colors)
 
         self.num_parents = 0
         self.width = 0
@@ -158,6 +165,7 @@ class Graph(object):  # pylint: disable=too-many-instance-attributes,bad-option-
         self.prev_state = GraphState.PADDING
         self.commit_index = 0
         self.prev_commit_index = 0
+        self.column_capacity = 0
         self.num_columns = 0
         self.num_new_columns = 0
         self.mapping_size = 0
@@ -166,40 +174,222 @@ class Graph(object):  # pylint: disable=too-many-instance-attributes,bad-option-
         # This way we start at 0 for the first commit.
         self.default_column_color = len(self.column_colors) - 1
 
-        self.columns = {}
-        self.new_columns = {}
-        self.mapping = {}
-        self.new_mapping = {}
+        self.columns = []
+        self.new_columns = []
+        self.column_index = {}
+        self.new_column_index = {}
+        self.mapping = array(INDEX_TYPECODE)
+        self.new_mapping = array(INDEX_TYPECODE)
+
+        self.stats = None
+        if stats:
+            from .stats import instrument  # pylint: disable=bad-option-value,import-outside-toplevel
+            self.stats = instrument(self)
 
-    def show_nodes(self, tips):
+    def show_nodes(self, tips, max_count=None, generations=None, key=None):
         """Show an ASCII DAG for the nodes provided.
 
-        Nodes are walked and returned without duplicates and then
-        sorted topologically (a requirement of the algorithm). The
+        Nodes are walked (each exactly once) and then sorted
+        topologically (a requirement of the algorithm). In
+        first-parent mode only the first-parent history of each tip
+        is walked, so side branches are never visited. The
         original Git API is then used internally to display the graph
         line-by-line, outputting the Node's content at the relevant
         point.
 
+        If generation numbers are provided, the walk and the sort are
+        done incrementally instead (see
+        :func:`~asciidag.sequence.incremental_topological_order`), so
+        that showing only the first ``max_count`` nodes touches only
+        as much of the DAG as is needed to place them. The output is
+        the same either way.
+
+        If a key is provided, the nodes are sorted so that of those
+        whose children have all been shown, the one with the highest
+        key comes next, as with ``git log --date-order`` when the key
+        is a node's date (see
+        :func:`~asciidag.sequence.sort_in_key_order`). The whole DAG is
+        then walked, and generation numbers are not used.
+
         Args:
             tips (:obj:`list` of :obj:`Node`): tips of trees to display
+            max_count (:obj:`int`): stop after showing this many nodes, like ``git log -n``.
+            generations (:obj:`dict`): mapping of node to generation number,
+                see :func:`~asciidag.sequence.generation_numbers`.
+            key (:obj:`callable`): function of a node to the value to order ready nodes by, highest first.
+
+        """
+        self._write_lines(self.iter_lines(tips, max_count, generations, key))
+
+    def show_sorted_nodes(self, nodes):
+        """Show an ASCII DAG for nodes that are already in topological order.
+
+        Unlike :meth:`show_nodes`, no walking or sorting is done: the
+        nodes are consumed one at a time from any iterable (such as a
+        generator over ``git log --topo-order`` output) and each is
+        written as soon as it is reached. Every node must come after
+        all of its children, and the parents of a node are only
+        consulted to lay out its branch lines, so memory is bounded by
+        the number of columns rather than the size of the DAG.
+
+        Args:
+            nodes (:obj:`iterable` of :obj:`Node`): nodes to display, children first
+
+        """
+        self._write_lines(self.iter_sorted_lines(nodes))
+
+    def feed(self, nodes):
+        """Extend the output with the next batch of nodes in topological order.
+
+        Branch lines left open by earlier batches (or by any earlier
+        call that showed nodes) are continued, so feeding successive
+        pages of a topological order writes exactly what showing them
+        all at once would, and each node is only processed once. Nodes
+        must be the same objects from one batch to the next, as
+        provided by :class:`~asciidag.loader.IncrementalLoader`.
+
+        Args:
+            nodes (:obj:`iterable` of :obj:`Node`): the next nodes to display, children first
+
+        """
+        self.show_sorted_nodes(nodes)
+
+    def iter_lines(self, tips, max_count=None, generations=None, key=None):
+        """Iterate over the lines of an ASCII DAG for the nodes provided.
+
+        This is the generator behind :meth:`show_nodes`, taking the
+        same arguments. Each line is yielded as a ``(graph_prefix,
+        node)`` tuple, where ``node`` is the Node shown on that line, or
+        ``None`` for lines that only contain branch lines. Nothing is
+        written to the file handle.
+
+        Args:
+            tips (:obj:`list` of :obj:`Node`): tips of trees to display
+            max_count (:obj:`int`): stop after this many nodes.
+            generations (:obj:`dict`): mapping of node to generation number.
+            key (:obj:`callable`): function of a node to the value to order ready nodes by.
+
+        """
+        if generations is None or key is not None:
+            nodes = self._sort(self._walk(tips), key)
+        else:
+            nodes = self._incremental_sort(tips, generations)
+        if max_count is not None:
+            nodes = islice(nodes, max_count)
+        return self.iter_sorted_lines(nodes)
+
+    def iter_sorted_lines(self, nodes):
+        """Iterate over the lines of an ASCII DAG for nodes already in topological order.
+
+        This is the generator behind :meth:`show_sorted_nodes`, yielding
+        lines as described for :meth:`iter_lines`.
+
+        Args:
+            nodes (:obj:`iterable` of :obj:`Node`): nodes to display, children first
 
         """
-        nodes = sort_in_topological_order(list(once(walk_nodes(tips))))
         for node in nodes:
             self._update(node)
-            self._show_commit()
-            self.outfile.write(node.item)
-            if not self._is_commit_finished():
-                self.outfile.write('\n')
-                self._show_remainder()
-            self.outfile.write('\n')
+            for line in self._show_commit():
+                yield line
+            for line in self._show_remainder():
+                yield line
+
+    def snapshot(self):
+        """Capture the state of the graph, to be restored later.
+
+        Returns:
+            :obj:`GraphSnapshot`: a copy of everything that determines the following lines.
+
+        """
+        return GraphSnapshot(
+            commit=self.commit,
+            num_parents=self.num_parents,
+            width=self.width,
+            expansion_row=self.expansion_row,
+            state=self.state,
+            prev_state=self.prev_state,
+            commit_index=self.commit_index,
+            prev_commit_index=self.prev_commit_index,
+            default_column_color=self.default_column_color,
+            columns=tuple((col.commit, col.color) for col in self.columns[:self.num_columns]),
+            new_columns=tuple((col.commit, col.color) for col in self.new_columns[:self.num_new_columns]),
+            mapping=self.mapping[:self.mapping_size],
+        )
+
+    def restore(self, snapshot):
+        """Return the graph to a state captured by :meth:`snapshot`.
+
+        The snapshot may come from another Graph, as long as it was
+        created with the same options.
+
+        Args:
+            snapshot (:obj:`GraphSnapshot`): state to restore.
+
+        """
+        self.commit = snapshot.commit
+        self.num_parents = snapshot.num_parents
+        self.width = snapshot.width
+        self.expansion_row = snapshot.expansion_row
+        self.state = snapshot.state
+        self.prev_state = snapshot.prev_state
+        self.commit_index = snapshot.commit_index
+        self.prev_commit_index = snapshot.prev_commit_index
+        self.default_column_color = snapshot.default_column_color
+
+        self._ensure_capacity(max(len(snapshot.columns), len(snapshot.new_columns), len(snapshot.mapping) // 2 + 1))
+        self.num_columns = len(snapshot.columns)
+        self.num_new_columns = len(snapshot.new_columns)
+        self.mapping_size = len(snapshot.mapping)
+        self.column_index.clear()
+        for i, (commit, color) in enumerate(snapshot.columns):
+            self.columns[i] = Column(commit, color)
+            self.column_index[commit] = i
+        self.new_column_index.clear()
+        for i, (commit, color) in enumerate(snapshot.new_columns):
+            self.new_columns[i] = Column(commit, color)
+            self.new_column_index[commit] = i
+        self.mapping[:self.mapping_size] = snapshot.mapping
+
+    def layout_state(self):
+        """Return the lane layout between two nodes.
+
+        Between nodes, the lines still to come depend only on this
+        layout and on the nodes still to be shown, so two renders that
+        reach the same node with equal layouts will output the same
+        lines from there on. Columns are identified by their commits,
+        so layouts are only comparable between renders of the same
+        node objects. With color, new branch lines shift the colors of
+        everything after them, so layouts rarely match.
+
+        Returns:
+            :obj:`tuple`: the columns and the state carried over to the next node.
+
+        """
+        # Without color the color index never shows, so it need not match.
+        color = self.default_column_color if self.use_color else None
+        return (self.state, self.prev_state, self.commit_index, color,
+                tuple((col.commit, col.color) for col in self.new_columns[:self.num_new_columns]))
+
+    def _walk(self, tips):
+        return list(walk_nodes(tips, self.first_parent_only))
+
+    def _sort(self, nodes, key=None):
+        return sort_in_topological_order(nodes, self.first_parent_only, key)
+
+    def _incremental_sort(self, tips, generations):
+        return incremental_topological_order(tips, generations, self.first_parent_only)
+
+    def _write_lines(self, lines):
+        write = self.outfile.write
+        for prefix, node in lines:
+            if node is None:
+                write(prefix + '\n')
+            else:
+                write(prefix + node.item + '\n')
 
     def _write_column(self, col, col_char):
-        if col.color is not None:
-            self.buf += self.column_colors[col.color]
-        self.buf += col_char
-        if col.color is not None:
-            self.buf += self.column_colors[-1]
+        self.buf.write_column(col.color, col_char)
 
     def _update_state(self, state):
         self.prev_state = self.state
@@ -221,22 +411,28 @@ class Graph(object):  # pylint: disable=too-many-instance-attributes,bad-option-
                                      % len(self.column_colors))
 
     def _find_commit_color(self, commit):
-        for i in range(self.num_columns):
-            if self.columns[i].commit == commit:
-                return self.columns[i].color
+        i = self.column_index.get(commit)
+        if i is not None:
+            return self.columns[i].color
         return self._get_current_column_color()
 
     def _insert_into_new_columns(self, commit, mapping_index):
         # If the commit is already in the new_columns list, we don't need to
         # add it. Just update the mapping correctly.
-        for i in range(self.num_new_columns):
-            if self.new_columns[i].commit == commit:
-                self.mapping[mapping_index] = i
-                return mapping_index + 2
-
-        # This commit isn't already in new_columns. Add it.
-        column = Column(commit, self._find_commit_color(commit))
-        self.new_columns[self.num_new_columns] = column
+        i = self.new_column_index.get(commit)
+        if i is not None:
+            self.mapping[mapping_index] = i
+            return mapping_index + 2
+
+        # This commit isn't already in new_columns. Add it, re-using
+        # the Column left in this slot by an earlier row if there is one.
+        column = self.new_columns[self.num_new_columns]
+        if column is None:
+            self.new_columns[self.num_new_columns] = Column(commit, self._find_commit_color(commit))
+        else:
+            column.commit = commit
+            column.color = self._find_commit_color(commit)
+        self.new_column_index[commit] = self.num_new_columns
         self.mapping[mapping_index] = self.num_new_columns
         self.num_new_columns += 1
         return mapping_index + 2
@@ -265,6 +461,20 @@ class Graph(object):  # pylint: disable=too-many-instance-attributes,bad-option-
         # Each column takes up 2 spaces
         self.width = max_cols * 2
 
+    def _ensure_capacity(self, num_columns):
+        # Grow the column and mapping storage geometrically, so that it
+        # is allocated rarely and then re-used for every following row.
+        if self.column_capacity >= num_columns:
+            return
+
+        capacity = max(self.column_capacity * 2, num_columns, 30)
+        extra = capacity - self.column_capacity
+        self.columns.extend([None] * extra)
+        self.new_columns.extend([None] * extra)
+        self.mapping.extend([-1] * (2 * extra))
+        self.new_mapping.extend([-1] * (2 * extra))
+        self.column_capacity = capacity
+
     def _update_columns(self):
         # Swap self.columns with self.new_columns
         # self.columns contains the state for the previous commit,
@@ -273,8 +483,10 @@ class Graph(object):  # pylint: disable=too-many-instance-attributes,bad-option-
         # We'll re-use the old columns array as storage to compute the new
         # columns list for the commit after this one.
         self.columns, self.new_columns = self.new_columns, self.columns
+        self.column_index, self.new_column_index = self.new_column_index, self.column_index
         self.num_columns = self.num_new_columns
         self.num_new_columns = 0
+        self.new_column_index.clear()
 
         # Now update new_columns and mapping with the information for the
         # commit after this one.
@@ -283,6 +495,7 @@ class Graph(object):  # pylint: disable=too-many-instance-attributes,bad-option-
         # be self.num_columns + self.num_parents columns for the next
         # commit.
         max_new_columns = self.num_columns + self.num_parents
+        self._ensure_capacity(max_new_columns)
 
         # Clear out self.mapping
         self.mapping_size = 2 * max_new_columns
@@ -401,20 +614,20 @@ class Graph(object):  # pylint: disable=too-many-instance-attributes,bad-option-
             return
 
         extra = self.width - chars_written
-        self.buf += ' ' * extra
+        self.buf.write(' ' * extra)
 
     def _output_padding_line(self):
         # Output a padding row, that leaves all branch lines unchanged
         for i in range(self.num_new_columns):
             self._write_column(self.new_columns[i], '|')
-            self.buf += ' '
+            self.buf.write(' ')
 
         self._pad_horizontally(self.num_new_columns * 2)
 
     def _output_skip_line(self):
         # Output an ellipsis to indicate that a portion
         # of the graph is missing.
-        self.buf += '...'
+        self.buf.write('...')
         self._pad_horizontally(3)
 
         if self.num_parents >= 3 and self.commit_index < self.num_columns - 1:
@@ -444,7 +657,7 @@ class Graph(object):  # pylint: disable=too-many-instance-attributes,bad-option-
             if col.commit == self.commit:
                 seen_this = True
                 self._write_column(col, '|')
-                self.buf += ' ' * self.expansion_row
+                self.buf.write(' ' * self.expansion_row)
                 chars_written += 1 + self.expansion_row
             elif seen_this and (self.expansion_row == 0):
                 # This is the first line of the pre-commit output.
@@ -466,7 +679,7 @@ class Graph(object):  # pylint: disable=too-many-instance-attributes,bad-option-
             else:
                 self._write_column(col, '|')
                 chars_written += 1
-            self.buf += ' '
+            self.buf.write(' ')
             chars_written += 1
 
         self._pad_horizontally(chars_written)
@@ -485,12 +698,18 @@ class Graph(object):  # pylint: disable=too-many-instance-attributes,bad-option-
         dashless_commits = 2
         num_dashes = ((self.num_parents - dashless_commits) * 2) - 1
         for i in range(num_dashes):
-            col_num = i // 2 + dashless_commits + self.commit_index
-            self._write_column(self.new_columns[col_num], '-')
-        col_num = num_dashes // 2 + dashless_commits + self.commit_index
-        self._write_column(self.new_columns[col_num], '.')
+            self._write_column(self._parent_column(i // 2 + dashless_commits), '-')
+        self._write_column(self._parent_column(num_dashes // 2 + dashless_commits), '.')
         return num_dashes + 1
 
+    def _parent_column(self, parent_index):
+        # Return the new column of one of the current commit's parents.
+        # The mapping has two entries per column, and those of the
+        # parents start at the commit's own column. A parent that
+        # already had a column further left keeps it, so parents are
+        # not always in the columns just after the commit.
+        return self.new_columns[self.mapping[2 * (self.commit_index + parent_index)]]
+
     def _output_commit_line(self):  # noqa: C901 pylint: disable=too-many-branches
         # Output the row containing this commit
         # Iterate up to and including self.num_columns,
@@ -510,7 +729,7 @@ class Graph(object):  # pylint: disable=too-many-instance-attributes,bad-option-
 
             if col_commit == self.commit:
                 seen_this = True
-                self.buf += '*'
+                self.buf.write('*')
                 chars_written += 1
 
                 if self.num_parents > 2:
@@ -539,7 +758,7 @@ class Graph(object):  # pylint: disable=too-many-instance-attributes,bad-option-
             else:
                 self._write_column(col, '|')
                 chars_written += 1
-            self.buf += ' '
+            self.buf.write(' ')
             chars_written += 1
 
         self._pad_horizontally(chars_written)
@@ -552,10 +771,10 @@ class Graph(object):  # pylint: disable=too-many-instance-attributes,bad-option-
             self._update_state(GraphState.COLLAPSING)
 
     def _find_new_column_by_commit(self, commit):
-        for i in range(self.num_new_columns):
-            if self.new_columns[i].commit == commit:
-                return self.new_columns[i]
-        return None
+        i = self.new_column_index.get(commit)
+        if i is None:
+            return None
+        return self.new_columns[i]
 
     def _output_post_merge_line(self):
         seen_this = False
@@ -575,26 +794,29 @@ class Graph(object):  # pylint: disable=too-many-instance-attributes,bad-option-
                 # new_columns and use those to format the
                 # edges.
                 seen_this = True
+                # Nodes may be any hashable, such as ArrayGraph's
+                # integer indices, so only None is not a valid one.
                 parents = self._interesting_parents()
-                assert parents, 'merge has no parents'
-                par_column = self._find_new_column_by_commit(next(parents))
-                assert par_column, 'parent column not found'
+                parent = next(parents, None)
+                assert parent is not None, 'merge has no parents'
+                par_column = self._find_new_column_by_commit(parent)
+                assert par_column is not None, 'parent column not found'
                 self._write_column(par_column, '|')
                 chars_written += 1
                 for parent in parents:
-                    assert parent, 'parent is not valid'
+                    assert parent is not None, 'parent is not valid'
                     par_column = self._find_new_column_by_commit(parent)
-                    assert par_column, 'parent column not found'
+                    assert par_column is not None, 'parent column not found'
                     self._write_column(par_column, '\\')
-                    self.buf += ' '
+                    self.buf.write(' ')
                 chars_written += (self.num_parents - 1) * 2
             elif seen_this:
                 self._write_column(col, '\\')
-                self.buf += ' '
+                self.buf.write(' ')
                 chars_written += 2
             else:
                 self._write_column(col, '|')
-                self.buf += ' '
+                self.buf.write(' ')
                 chars_written += 2
 
         self._pad_horizontally(chars_written)
@@ -686,7 +908,7 @@ class Graph(object):  # pylint: disable=too-many-instance-attributes,bad-option-
         for i in range(self.mapping_size):
             target = self.new_mapping[i]
             if target < 0:
-                self.buf += ' '
+                self.buf.write(' ')
             elif target * 2 == i:
                 self._write_column(self.new_columns[target], '|')
             elif target == horizontal_edge_target and i != horizontal_edge - 1:
@@ -749,9 +971,9 @@ class Graph(object):  # pylint: disable=too-many-instance-attributes,bad-option-
             col = self.columns[i]
             self._write_column(col, '|')
             if col.commit == self.commit and self.num_parents > 2:
-                self.buf += ' ' * (self.num_parents - 2) * 2
+                self.buf.write(' ' * (self.num_parents - 2) * 2)
             else:
-                self.buf += ' '
+                self.buf.write(' ')
 
         self._pad_horizontally(self.num_columns)
 
@@ -761,43 +983,29 @@ class Graph(object):  # pylint: disable=too-many-instance-attributes,bad-option-
     def _is_commit_finished(self):
         return self.state == GraphState.PADDING
 
-    def _show_commit(self):
-        shown_commit_line = False
+    def _flush_line(self):
+        return self.buf.getvalue()
 
+    def _show_commit(self):
+        # Yield the lines up to and including the one for the commit itself.
+        #
         # When showing a diff of a merge against each of its parents, we
         # are called once for each parent without update having been
         # called. In this case, simply output a single padding line.
         if self._is_commit_finished():
-            self._show_padding()
-            shown_commit_line = True
+            yield self._show_padding(), self.commit
+            return
 
+        shown_commit_line = False
         while not shown_commit_line and not self._is_commit_finished():
             shown_commit_line = self._next_line()
-            self.outfile.write(self.buf)
-            if not shown_commit_line:
-                self.outfile.write('\n')
-            self.buf = ''
+            yield self._flush_line(), self.commit if shown_commit_line else None
 
     def _show_padding(self):
         self._padding_line()
-        self.outfile.write(self.buf)
-        self.buf = ''
+        return self._flush_line()
 
     def _show_remainder(self):
-        shown = False
-
-        if self._is_commit_finished():
-            return False
-
-        while True:
+        while not self._is_commit_finished():
             self._next_line()
-            self.outfile.write(self.buf)
-            self.buf = ''
-            shown = True
-
-            if not self._is_commit_finished():
-                self.outfile.write('\n')
-            else:
-                break
-
-        return shown
+            yield self._flush_line(), None
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""Loading of DAGs from ``git rev-list --parents`` style text.
+
+Each line holds the id of a node followed by the ids of its parents,
+separated by whitespace, as printed by ``git rev-list --parents`` or
+``git log --format='%H %P'``. Ids are strings. An optional mapping of
+id to label supplies the item of each node; ids without a label are
+used as the item themselves.
+"""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import mmap
+import os
+
+from .node import Node
+
+__all__ = ('IncrementalLoader', 'load', 'load_file', 'stream')
+
+
+def _split(line):
+    if isinstance(line, bytes):
+        line = line.decode('utf-8')
+    return line.split()
+
+
+def load(fh, labels=None):
+    """Load a whole DAG in a single pass over the lines of a file.
+
+    Nodes are shared by id. Ids that only appear as parents (such as
+    the boundary of a limited ``git rev-list``) become parentless nodes.
+
+    Args:
+        fh (:obj:`file`): text or binary file-like object, or any iterable of lines.
+        labels (:obj:`dict`): mapping of id to the item to show for that node.
+
+    Returns:
+        :obj:`dict` of id to Node, in order of first appearance.
+
+    """
+    if labels is None:
+        labels = {}
+    nodes = {}
+    for line in fh:
+        ids = _split(line)
+        if not ids:
+            continue
+        node_id = ids[0]
+        node = nodes.get(node_id)
+        if node is None:
+            node = nodes[node_id] = Node(labels.get(node_id, node_id))
+        parents = []
+        for parent_id in ids[1:]:
+            parent = nodes.get(parent_id)
+            if parent is None:
+                parent = nodes[parent_id] = Node(labels.get(parent_id, parent_id))
+            parents.append(parent)
+        node.parents = tuple(parents)
+    return nodes
+
+
+def load_file(path, labels=None):
+    """Load a whole DAG from a file on disk through a memory map.
+
+    The file is mapped read-only rather than read into memory, so
+    only the resulting nodes take up space.
+
+    Args:
+        path (:obj:`str`): path of the file to load.
+        labels (:obj:`dict`): mapping of id to the item to show for that node.
+
+    Returns:
+        :obj:`dict` of id to Node, in order of first appearance.
+
+    """
+    if os.path.getsize(path) == 0:
+        return {}
+    with open(path, 'rb') as fh:
+        mapped = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            return load(iter(mapped.readline, b''), labels)
+        finally:
+            mapped.close()
+
+
+def stream(fh, labels=None):
+    """Iterate over nodes as their lines are read.
+
+    Intended for input in topological order (``git rev-list
+    --topo-order --parents``) to be passed straight to
+    :meth:`Graph.show_sorted_nodes`. Only nodes which have been
+    mentioned as parents but whose own line has not yet been read are
+    remembered, so memory is bounded by the number of branch lines
+    rather than the size of the DAG. The parents of each node are
+    filled in when the node's own line is read.
+
+    Args:
+        fh (:obj:`file`): text or binary file-like object, or any iterable of lines.
+        labels (:obj:`dict`): mapping of id to the item to show for that node.
+
+    """
+    return IncrementalLoader(labels).iter_nodes(fh)
+
+
+class IncrementalLoader(object):  # pylint: disable=bad-option-value,useless-object-inheritance
+    """Loader for topologically ordered lines arriving in batches.
+
+    Parents mentioned in one batch are remembered until their own line
+    arrives in a later one, so that every batch shares nodes with the
+    batches before it. Together with :meth:`Graph.feed` this allows
+    paging through a history with each line parsed and each node drawn
+    exactly once.
+
+    Attributes:
+        labels  -- The mapping of id to the item to show for that node.
+        pending -- The nodes mentioned as parents whose own lines are still to come, by id.
+
+    """
+
+    def __init__(self, labels=None):
+        """Create a loader with no pending nodes.
+
+        Args:
+            labels (:obj:`dict`): mapping of id to the item to show for that node.
+        """
+        if labels is None:
+            labels = {}
+        self.labels = labels
+        self.pending = {}
+
+    def feed(self, lines):
+        """Load the next batch of lines.
+
+        Args:
+            lines (:obj:`iterable`): text or binary lines.
+
+        Returns:
+            :obj:`list` of :obj:`Node`: the nodes of the batch, in the order of their lines.
+
+        """
+        return list(self.iter_nodes(lines))
+
+    def iter_nodes(self, lines):
+        """Iterate over the nodes of the next batch of lines as each is read.
+
+        Args:
+            lines (:obj:`iterable`): text or binary lines.
+
+        """
+        labels = self.labels
+        pending = self.pending
+        for line in lines:
+            ids = _split(line)
+            if not ids:
+                continue
+            node_id = ids[0]
+            node = pending.pop(node_id, None)
+            if node is None:
+                node = Node(labels.get(node_id, node_id))
+            parents = []
+            for parent_id in ids[1:]:
+                parent = pending.get(parent_id)
+                if parent is None:
+                    parent = pending[parent_id] = Node(labels.get(parent_id, parent_id))
+                parents.append(parent)
+            node.parents = tuple(parents)
+            yield node
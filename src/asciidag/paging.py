@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""Random access to the lines of large rendered DAGs through checkpoints."""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+from bisect import bisect_right
+from collections import namedtuple
+from itertools import islice
+
+__all__ = ('Checkpoint', 'CheckpointIndex')
+
+Checkpoint = namedtuple('Checkpoint', ('row', 'position', 'snapshot'))
+Checkpoint.__doc__ = """State of a Graph just before the first line of a node.
+
+Attributes:
+    row      -- The index of the next line of output.
+    position -- The index of the next node in the sorted nodes.
+    snapshot -- The :obj:`GraphSnapshot` to restore.
+"""
+
+
+class CheckpointIndex(object):  # pylint: disable=bad-option-value,useless-object-inheritance
+    """Snapshots of a Graph taken every few rows, to resume rendering from.
+
+    The lines of a DAG are rendered once through :meth:`iter_lines`,
+    which records a checkpoint at the first node boundary after every
+    ``interval`` rows. :meth:`seek` can then produce the lines from any
+    row by restoring the nearest checkpoint before it, rendering at
+    most about ``interval`` rows that are not wanted.
+
+    Attributes:
+        interval    -- The minimum number of rows between checkpoints.
+        checkpoints -- The :obj:`Checkpoint` list, in order of row.
+
+    """
+
+    def __init__(self, interval=4096):
+        """Create an empty index.
+
+        Args:
+            interval (:obj:`int`): minimum number of rows between checkpoints.
+        """
+        self.interval = interval
+        self.checkpoints = []
+        self._rows = []
+
+    def iter_lines(self, graph, nodes):
+        """Iterate over the lines of a DAG whilst recording checkpoints.
+
+        Args:
+            graph (:obj:`Graph`): graph to render with.
+            nodes (:obj:`iterable` of :obj:`Node`): nodes in topological order.
+
+        """
+        del self.checkpoints[:]
+        del self._rows[:]
+        row = 0
+        next_checkpoint = 0
+        for position, node in enumerate(nodes):
+            if row >= next_checkpoint:
+                self.checkpoints.append(Checkpoint(row, position, graph.snapshot()))
+                self._rows.append(row)
+                next_checkpoint = row + self.interval
+            for line in graph.iter_sorted_lines((node,)):
+                yield line
+                row += 1
+
+    def seek(self, graph, nodes, row):
+        """Iterate over the lines of a DAG starting from the given row.
+
+        Args:
+            graph (:obj:`Graph`): graph to render with, created with the same options as when indexing.
+            nodes (:obj:`sequence` of :obj:`Node`): the same nodes as were indexed, supporting indexing.
+            row (:obj:`int`): index of the first line to produce.
+
+        Raises:
+            ValueError: if nothing has been indexed yet.
+            IndexError: if the row is negative.
+        """
+        if not self.checkpoints:
+            raise ValueError("cannot seek before the lines have been indexed by iter_lines()")
+        if row < 0:
+            raise IndexError("row must not be negative: {}".format(row))
+        checkpoint = self.checkpoints[bisect_right(self._rows, row) - 1]
+        graph.restore(checkpoint.snapshot)
+        remaining = (nodes[position] for position in range(checkpoint.position, len(nodes)))
+        return islice(graph.iter_sorted_lines(remaining), row - checkpoint.row, None)
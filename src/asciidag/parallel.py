@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""Rendering of disjoint histories in parallel worker processes.
+
+Tips from unrelated histories (several repositories, orphan branches)
+form weakly connected components that share no branch lines, so each
+can be laid out by its own :class:`~asciidag.graph.Graph`. Components
+are flattened into plain lists before being sent to a worker, since
+pickling long chains of nodes directly would recurse once per node.
+"""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import io
+from contextlib import closing
+from multiprocessing import Pool
+
+from .graph import Graph
+from .node import Node
+from .sequence import walk_nodes, weakly_connected_components
+
+__all__ = ('flatten', 'iter_components', 'show_components', 'unflatten')
+
+
+def flatten(tips, first_parent_only=False):
+    """Flatten the DAG reachable from the tips into picklable lists.
+
+    Args:
+        tips (:obj:`list` of :obj:`Node`): tips of the DAG.
+        first_parent_only (:obj:`bool`): only keep the edge to the first parent of each node.
+
+    Returns:
+        :obj:`tuple`: a list of ``(item, parent_indices)`` pairs, one
+        per node in walk order, and the list of indices of the tips.
+
+    """
+    nodes = list(walk_nodes(tips, first_parent_only))
+    index = dict((node, i) for i, node in enumerate(nodes))
+    records = [(node.item, tuple(index[parent] for parent in
+                                 (node.parents[:1] if first_parent_only else node.parents)))
+               for node in nodes]
+    return records, [index[tip] for tip in tips]
+
+
+def unflatten(records, tip_indices):
+    """Rebuild the nodes flattened by :func:`flatten`.
+
+    Returns:
+        :obj:`list` of :obj:`Node`: the tips.
+
+    """
+    nodes = [Node(item) for item, _ in records]
+    for node, (_, parent_indices) in zip(nodes, records):
+        node.parents = tuple(nodes[i] for i in parent_indices)
+    return [nodes[i] for i in tip_indices]
+
+
+def _render(task):
+    records, tip_indices, graph_options = task
+    out = io.StringIO()
+    Graph(fh=out, **graph_options).show_nodes(unflatten(records, tip_indices))
+    return out.getvalue()
+
+
+def iter_components(tips, processes=None, **graph_options):
+    """Iterate over the rendered text of each component of the DAG, in order.
+
+    Each weakly connected component is rendered by a fresh Graph in a
+    pool of worker processes, and the texts are produced in the order
+    of the first tip of each component, whichever worker finishes
+    first. Without color, the concatenated texts are exactly what
+    showing the components one after another in a single Graph would
+    write; with color, each component starts again from the first
+    color.
+
+    Args:
+        tips (:obj:`list` of :obj:`Node`): tips of trees to display.
+        processes (:obj:`int`): number of worker processes, defaulting to the number of CPUs.
+        graph_options: keyword arguments for each :class:`Graph`, other than ``fh``.
+
+    """
+    tips = list(tips)
+    first_parent_only = graph_options.get('first_parent_only', False)
+    components = weakly_connected_components(tips, first_parent_only)
+    if processes == 1 or len(components) < 2:
+        for component in components:
+            out = io.StringIO()
+            Graph(fh=out, **graph_options).show_nodes(component)
+            yield out.getvalue()
+        return
+
+    tasks = (flatten(component, first_parent_only) + (graph_options,) for component in components)
+    with closing(Pool(processes)) as pool:
+        try:
+            for text in pool.imap(_render, tasks):
+                yield text
+        finally:
+            pool.terminate()
+            pool.join()
+
+
+def show_components(graph, tips, processes=None):
+    """Show each disjoint history among the tips separately, in parallel.
+
+    The texts of :func:`iter_components` are written to the graph's
+    file handle one after another. The graph's options are used, but
+    not its state, which is left unchanged.
+
+    Args:
+        graph (:obj:`Graph`): graph whose options and file handle to use.
+        tips (:obj:`list` of :obj:`Node`): tips of trees to display.
+        processes (:obj:`int`): number of worker processes, defaulting to the number of CPUs.
+
+    """
+    write = graph.outfile.write
+    for text in iter_components(tips, processes, first_parent_only=graph.first_parent_only,
+                                use_color=graph.use_color, column_colors=graph.column_colors):
+        write(text)
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""Re-rendering of changing DAGs that re-uses the unchanged tail of the previous render."""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+from collections import namedtuple
+
+from .graph import Graph
+from .sequence import walk_nodes, sort_in_topological_order
+
+__all__ = ('ReusingRenderer',)
+
+RenderRecord = namedtuple('RenderRecord', ('nodes', 'states', 'starts', 'lines'))
+RenderRecord.__doc__ = """Everything kept from a render to splice into the next one.
+
+Attributes:
+    nodes  -- The nodes in the order they were shown.
+    states -- The :meth:`Graph.layout_state` just before each node.
+    starts -- The index into lines of the first line of each node.
+    lines  -- The rendered ``(graph_prefix, node)`` lines.
+"""
+
+
+class ReusingRenderer(object):  # pylint: disable=bad-option-value,useless-object-inheritance
+    """Renders successive versions of a DAG, re-using the tail of the previous render.
+
+    When new nodes are added above existing ones (such as commits
+    pushed onto a branch), the output changes only until the lane
+    layout before some node matches the layout before the same node
+    last time. From that node on, if the remaining nodes are also the
+    same, the previous lines are spliced in rather than rendered
+    again, so the state machine only runs over the changed rows. The
+    walk and the sort still cover the whole DAG.
+
+    Attributes:
+        graph_options -- The keyword arguments for each :class:`Graph`.
+        record        -- The :obj:`RenderRecord` of the previous render, or None.
+        reused_lines  -- The number of lines spliced in by the last render.
+
+    """
+
+    def __init__(self, **graph_options):
+        """Create a renderer with no previous render.
+
+        Args:
+            graph_options: keyword arguments for :class:`Graph` (other than ``fh``).
+        """
+        self.graph_options = graph_options
+        self.record = None
+        self.reused_lines = 0
+
+    def render(self, tips):
+        """Render the DAG reachable from the tips.
+
+        Args:
+            tips (:obj:`list` of :obj:`Node`): tips of trees to display.
+
+        Returns:
+            :obj:`list` of ``(graph_prefix, node)`` lines, as from :meth:`Graph.iter_lines`.
+
+        """
+        graph = Graph(**self.graph_options)
+        nodes = list(walk_nodes(tips, graph.first_parent_only))
+        nodes = list(sort_in_topological_order(nodes, graph.first_parent_only))
+        shared_from, shift = self._shared_tail(nodes)
+        record = RenderRecord(nodes, [], [], [])
+        self.reused_lines = 0
+
+        for position, node in enumerate(nodes):
+            state = graph.layout_state()
+            if position >= shared_from and self.record.states[position - shift] == state:
+                self._splice(record, position - shift)
+                break
+            record.states.append(state)
+            record.starts.append(len(record.lines))
+            record.lines.extend(graph.iter_sorted_lines((node,)))
+
+        self.record = record
+        return record.lines
+
+    def _splice(self, record, old_position):
+        # Append the previous render from a node on to a new one.
+        previous = self.record
+        old_start = previous.starts[old_position]
+        offset = len(record.lines) - old_start
+        record.states.extend(previous.states[old_position:])
+        record.starts.extend(start + offset for start in previous.starts[old_position:])
+        record.lines.extend(previous.lines[old_start:])
+        self.reused_lines = len(previous.lines) - old_start
+
+    def _shared_tail(self, nodes):
+        # The position in nodes from which they are the same objects as
+        # the last nodes of the previous render, and the difference
+        # between the positions of each in the two renders.
+        if self.record is None:
+            return len(nodes), 0
+        old_nodes = self.record.nodes
+        shared = 0
+        for node, old_node in zip(reversed(nodes), reversed(old_nodes)):
+            if node is not old_node:
+                break
+            shared += 1
+        return len(nodes) - shared, len(nodes) - len(old_nodes)
@@ -3,16 +3,39 @@
 
 from __future__ import absolute_import, division, print_function, unicode_literals
 
-from collections import defaultdict
+from collections import defaultdict, deque
+from heapq import heappop, heappush
+from itertools import count
 
 
-def walk_nodes(nodes):
-    """Iterate over nodes in breadth-first order."""
+def _parents(node, first_parent_only):
+    if first_parent_only:
+        return node.parents[:1]
+    return node.parents
+
+
+def walk_nodes(nodes, first_parent_only=False):
+    """Iterate over nodes and their ancestors in breadth-first order.
+
+    Each node is yielded exactly once, however many paths lead to it,
+    and the walk is iterative so that arbitrarily long chains do not
+    hit the recursion limit. The cost is O(V+E) in the number of
+    reachable nodes and parent edges. With ``first_parent_only`` only
+    the first parent of each node is followed.
+    """
+    seen = set()
+    queue = deque()
     for node in nodes:
+        if node not in seen:
+            seen.add(node)
+            queue.append(node)
+    while queue:
+        node = queue.popleft()
         yield node
-    for node in nodes:
-        for ancestor in walk_nodes(node.parents):
-            yield ancestor
+        for parent in _parents(node, first_parent_only):
+            if parent not in seen:
+                seen.add(parent)
+                queue.append(parent)
 
 
 def once(nodes):
@@ -24,21 +47,33 @@ def once(nodes):
             yield node
 
 
-def sort_in_topological_order(nodes):
-    """Iterate over nodes in topological order."""
+def sort_in_topological_order(nodes, first_parent_only=False, key=None):
+    """Iterate over nodes in topological order.
+
+    With ``first_parent_only`` only the edge to the first parent of
+    each node is considered. With a ``key``, the order is that of
+    :func:`sort_in_key_order`, like Git's ``--date-order`` when the
+    key is a node's date.
+    """
+    if key is not None:
+        return sort_in_key_order(nodes, key, first_parent_only)
+    return _sort_in_discovery_order(nodes, first_parent_only)
+
+
+def _sort_in_discovery_order(nodes, first_parent_only):
     in_degree = defaultdict(lambda: 0)
 
     for node in nodes:
         in_degree[node] = 1
 
     for node in nodes:
-        for parent in node.parents:
+        for parent in _parents(node, first_parent_only):
             if in_degree[parent] > 0:
                 in_degree[parent] += 1
 
     queue = [node for node in nodes if in_degree[node] == 1]
     for node in queue:
-        for parent in node.parents:
+        for parent in _parents(node, first_parent_only):
             if in_degree[parent] == 0:
                 continue
             in_degree[parent] -= 1
@@ -46,3 +81,162 @@ def sort_in_topological_order(nodes):
                 queue.append(parent)
         in_degree[node] = 0
         yield node
+
+
+def sort_in_key_order(nodes, key, first_parent_only=False):
+    """Iterate over nodes in topological order, highest key first among those ready.
+
+    Of all the nodes whose children have been yielded, the one with
+    the highest key comes next, ties going to the node given first.
+    The key is computed once per node, by ranking the nodes up front,
+    and the ready nodes are kept in a binary heap of ranks, so the
+    cost is O((V+E) log V). Parents which are not among the nodes are
+    ignored. With ``first_parent_only`` only the edge to the first
+    parent of each node is considered.
+
+    Args:
+        nodes (:obj:`iterable`): nodes to sort.
+        key (:obj:`callable`): function of a node to a comparable value, such as its date.
+        first_parent_only (:obj:`bool`): whether to consider only first parents.
+
+    """
+    return _sort_in_key_order(nodes, key, lambda node: _parents(node, first_parent_only))
+
+
+def _sort_in_key_order(nodes, key, parents):
+    # Shared with ArrayGraph, whose nodes are indices with their
+    # parents in arrays, hence the function of a node to its parents.
+    nodes = sorted(nodes, key=key, reverse=True)
+    rank = dict((node, i) for i, node in enumerate(nodes))
+    in_degree = [0] * len(nodes)
+    for node in nodes:
+        for parent in parents(node):
+            parent_rank = rank.get(parent)
+            if parent_rank is not None:
+                in_degree[parent_rank] += 1
+
+    # Ranks in increasing order already form a heap.
+    ready = [i for i, degree in enumerate(in_degree) if not degree]
+    while ready:
+        node = nodes[heappop(ready)]
+        yield node
+        for parent in parents(node):
+            parent_rank = rank.get(parent)
+            if parent_rank is None:
+                continue
+            in_degree[parent_rank] -= 1
+            if not in_degree[parent_rank]:
+                heappush(ready, parent_rank)
+
+
+def generation_numbers(tips):
+    """Compute the generation number of every node reachable from the tips.
+
+    As in Git's commit-graph, parentless nodes have generation 1 and
+    every other node has one more than the greatest generation of its
+    parents, so a node's generation is greater than that of any of
+    its ancestors. This walks the whole DAG; the result can be kept
+    and re-used with :func:`incremental_topological_order`.
+
+    Returns:
+        :obj:`dict` of node to generation number.
+
+    """
+    generations = {}
+    for node in reversed(list(sort_in_topological_order(list(walk_nodes(tips))))):
+        generations[node] = 1 + max([generations[parent] for parent in node.parents] or [0])
+    return generations
+
+
+def incremental_topological_order(tips, generations, first_parent_only=False):
+    """Iterate over the nodes reachable from the tips in topological order, lazily.
+
+    The order is the same as :func:`sort_in_topological_order` over
+    :func:`walk_nodes` of the tips, but nodes are only visited as far
+    as needed to place the next node, as in Git's incremental
+    ``--topo-order`` walk. Before a node is released, every node of
+    a greater generation (and so every possible descendant) has been
+    explored, which guarantees all of its children have been seen.
+    Taking the first N nodes touches roughly the part of the DAG down
+    to the generation of the Nth node.
+
+    Args:
+        tips (:obj:`list` of :obj:`Node`): tips of the DAG.
+        generations (:obj:`dict`): mapping of node to generation number, see :func:`generation_numbers`.
+        first_parent_only (:obj:`bool`): only consider the edge to the first parent of each node.
+
+    """
+    tips = list(once(tips))
+    in_degree = {}
+    explore_queue = []
+    tie_breaker = count()
+
+    def explore_to_generation(generation):
+        while explore_queue and -explore_queue[0][0] >= generation:
+            node = heappop(explore_queue)[2]
+            for parent in _parents(node, first_parent_only):
+                if parent in in_degree:
+                    in_degree[parent] += 1
+                else:
+                    in_degree[parent] = 2
+                    heappush(explore_queue, (-generations[parent], next(tie_breaker), parent))
+
+    for tip in tips:
+        in_degree[tip] = 1
+        heappush(explore_queue, (-generations[tip], next(tie_breaker), tip))
+    if tips:
+        explore_to_generation(min(generations[tip] for tip in tips))
+
+    queue = deque(tip for tip in tips if in_degree[tip] == 1)
+    while queue:
+        node = queue.popleft()
+        yield node
+        for parent in _parents(node, first_parent_only):
+            explore_to_generation(generations[parent])
+            in_degree[parent] -= 1
+            if in_degree[parent] == 1:
+                queue.append(parent)
+
+
+def weakly_connected_components(tips, first_parent_only=False):
+    """Group tips by the weakly connected component of the DAG they belong to.
+
+    Two tips are in the same component if their histories share any
+    node. Components are found with a union-find over one walk of the
+    DAG, in near-linear time.
+
+    Args:
+        tips (:obj:`list` of :obj:`Node`): tips of the DAG.
+        first_parent_only (:obj:`bool`): only consider the edge to the first parent of each node.
+
+    Returns:
+        :obj:`list` of :obj:`list` of :obj:`Node`: the tips of each component,
+        ordered by their first tip, each in the order given.
+
+    """
+    leaders = {}
+
+    def find(node):
+        leaders.setdefault(node, node)
+        while leaders[node] is not node:
+            # Path halving keeps the trees shallow.
+            leaders[node] = leaders[leaders[node]]
+            node = leaders[node]
+        return node
+
+    for node in walk_nodes(tips, first_parent_only):
+        root = find(node)
+        for parent in _parents(node, first_parent_only):
+            parent_root = find(parent)
+            if parent_root is not root:
+                leaders[parent_root] = root
+
+    components = {}
+    ordered = []
+    for tip in once(tips):
+        root = find(tip)
+        if root not in components:
+            components[root] = []
+            ordered.append(components[root])
+        components[root].append(tip)
+    return ordered
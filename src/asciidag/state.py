@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""The states and columns of a Graph and the builder of its lines of output.
+
+These are kept apart from :mod:`asciidag.graph` so that modules which
+extend a Graph, such as :mod:`asciidag.stats`, can use them without
+importing it.
+"""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+__all__ = ('Column', 'GraphState', 'LineBuilder')
+
+
+class GraphState(object):  # pylint: disable=bad-option-value,useless-object-inheritance
+    """The current state of the state machine.
+
+    States are plain integers rather than an Enum, which keeps
+    importing and comparing them cheap.
+    """
+
+    PADDING = 0
+    SKIP = 1
+    PRE_COMMIT = 2
+    COMMIT = 3
+    POST_MERGE = 4
+    COLLAPSING = 5
+
+
+class LineBuilder(object):  # pylint: disable=bad-option-value,useless-object-inheritance
+    """Accumulates a single line of output from runs of glyphs.
+
+    Pieces are collected in a list and joined once per line. Adjacent
+    glyphs of the same color share a single color code and reset.
+
+    Attributes:
+        column_colors -- The list of color codes, ending with the reset code.
+        parts         -- The pieces of the line written so far.
+        color         -- The color of the currently open run, if any.
+                         This is an index into column_colors.
+
+    """
+
+    def __init__(self, column_colors):
+        """Create a builder with an empty line, coloring glyphs with the given codes."""
+        self.column_colors = column_colors
+        self.parts = []
+        self.color = None
+
+    def write(self, text):
+        """Append uncolored text."""
+        self._close_color()
+        self.parts.append(text)
+
+    def write_column(self, color, col_char):
+        """Append a glyph in the given color (an index into column_colors, or None)."""
+        if color != self.color:
+            self._close_color()
+            if color is not None:
+                self.parts.append(self.column_colors[color])
+                self.color = color
+        self.parts.append(col_char)
+
+    def getvalue(self):
+        """Return the finished line and start a new one."""
+        self._close_color()
+        line = ''.join(self.parts)
+        self.parts = []
+        return line
+
+    def _close_color(self):
+        if self.color is not None:
+            self.parts.append(self.column_colors[-1])
+            self.color = None
+
+
+class Column(object):  # pylint: disable=bad-option-value,useless-object-inheritance
+    """A single column of output.
+
+    Attributes:
+        commit -- The parent commit of this column.
+        color  -- The color to (optionally) print this column in.
+                  This is an index into column_colors.
+
+    """
+
+    __slots__ = ('commit', 'color')
+
+    def __init__(self, commit, color):
+        """Create a column for a commit, drawn in the given color (an index into column_colors, or None)."""
+        self.commit = commit
+        self.color = color
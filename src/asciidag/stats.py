@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+"""Opt-in counters and timers for finding out where a render spends its time.
+
+Statistics are only collected for a :class:`~asciidag.graph.Graph`
+created with ``stats=True``. The instrumented methods are wrapped on
+that instance alone, so graphs without statistics run exactly the same
+code as before, with no per-line checks.
+
+Rows and timings are only collected for lines laid out by the Graph
+itself, not for components rendered in other processes by
+:mod:`asciidag.parallel`, although everything written to the Graph's
+file handle is counted.
+"""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+from functools import wraps
+from timeit import default_timer
+
+from .state import GraphState, LineBuilder
+
+__all__ = ('GraphStats', 'instrument')
+
+STATE_NAMES = tuple(sorted((name for name in vars(GraphState) if name.isupper()),
+                           key=lambda name: getattr(GraphState, name)))
+
+OUTPUT_METHODS = (
+    ('_output_padding_line', GraphState.PADDING),
+    ('_output_skip_line', GraphState.SKIP),
+    ('_output_pre_commit_line', GraphState.PRE_COMMIT),
+    ('_output_commit_line', GraphState.COMMIT),
+    ('_output_post_merge_line', GraphState.POST_MERGE),
+    ('_output_collapsing_line', GraphState.COLLAPSING),
+)
+
+
+class GraphStats(object):  # pylint: disable=bad-option-value,useless-object-inheritance
+    """Statistics collected over every render of one Graph.
+
+    Attributes:
+        rows              -- The number of rows output in each state, indexed by GraphState.
+        peak_num_columns  -- The largest number of columns before any commit.
+        peak_mapping_size -- The largest number of entries in the mapping.
+        bytes_written     -- The number of bytes written to the file handle, in its
+                             encoding (UTF-8 if it has none).
+        escape_bytes      -- The number of characters of color codes in the graph lines.
+        seconds           -- The cumulative time spent in the walk, the sort and each
+                             ``_output_*_line`` method, by name.
+
+    """
+
+    def __init__(self):
+        """Create statistics with every counter at zero."""
+        self.rows = [0] * len(STATE_NAMES)
+        self.peak_num_columns = 0
+        self.peak_mapping_size = 0
+        self.bytes_written = 0
+        self.escape_bytes = 0
+        self.seconds = dict.fromkeys(['walk', 'sort'] + [name for name, _ in OUTPUT_METHODS], 0.0)
+
+    def as_dict(self):
+        """Return the statistics as a dict of plain values, e.g. for a metrics pipeline.
+
+        Returns:
+            :obj:`dict`: with ``rows`` by state name, the peaks, the byte
+            counts and ``seconds`` by the name of what was timed.
+
+        """
+        return {
+            'rows': dict(zip(STATE_NAMES, self.rows)),
+            'peak_num_columns': self.peak_num_columns,
+            'peak_mapping_size': self.peak_mapping_size,
+            'bytes_written': self.bytes_written,
+            'escape_bytes': self.escape_bytes,
+            'seconds': dict(self.seconds),
+        }
+
+
+class CountingLineBuilder(LineBuilder):
+    """LineBuilder which counts the color codes in each finished line."""
+
+    def __init__(self, column_colors, stats):
+        """Create a builder that adds to the given statistics.
+
+        Args:
+            column_colors (:obj:`list` of :obj:`str`): as for LineBuilder.
+            stats (:obj:`GraphStats`): statistics to add to.
+        """
+        super(CountingLineBuilder, self).__init__(column_colors)
+        self.stats = stats
+        self.codes = frozenset(column_colors)
+
+    def getvalue(self):
+        """Return the finished line and start a new one, counting its color codes."""
+        self._close_color()
+        codes = self.codes
+        self.stats.escape_bytes += sum(len(part) for part in self.parts if part in codes)
+        return super(CountingLineBuilder, self).getvalue()
+
+
+class CountingWriter(object):  # pylint: disable=bad-option-value,useless-object-inheritance
+    """File-like object which counts the encoded size of what is written through it.
+
+    Attributes:
+        fh       -- The file handle written to.
+        encoding -- The encoding of the file handle, used to count bytes.
+        stats    -- The statistics to add to.
+
+    """
+
+    def __init__(self, fh, stats):
+        """Wrap a file handle.
+
+        Args:
+            fh (:obj:`file`): text file handle to write to.
+            stats (:obj:`GraphStats`): statistics to add to.
+        """
+        self.fh = fh
+        self.encoding = getattr(fh, 'encoding', None) or 'utf-8'
+        self.stats = stats
+
+    def write(self, text):
+        """Write text, counting its size once encoded."""
+        self.stats.bytes_written += len(text.encode(self.encoding))
+        return self.fh.write(text)
+
+    def __getattr__(self, name):
+        """Pass anything else, such as flush, on to the file handle."""
+        return getattr(self.fh, name)
+
+
+def _timed(method, stats, name, state=None):
+    seconds = stats.seconds
+    rows = stats.rows
+
+    @wraps(method)
+    def wrapper(*args):
+        if state is not None:
+            rows[state] += 1
+        start = default_timer()
+        try:
+            return method(*args)
+        finally:
+            seconds[name] += default_timer() - start
+    return wrapper
+
+
+def _timed_lazily(method, stats, name):
+    # Time a method returning a lazy sequence, and the sequence as it
+    # is consumed, so as to keep it lazy.
+    timed = _timed(method, stats, name)
+
+    @wraps(method)
+    def wrapper(*args):
+        return _timed_iter(timed(*args), stats, name)
+    return wrapper
+
+
+def _timed_iter(iterable, stats, name):
+    seconds = stats.seconds
+    iterator = iter(iterable)
+    while True:
+        start = default_timer()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            seconds[name] += default_timer() - start
+        yield item
+
+
+def instrument(graph):  # noqa: C901
+    """Collect statistics for every following render of a Graph.
+
+    Args:
+        graph (:obj:`Graph`): graph to instrument.
+
+    Returns:
+        :obj:`GraphStats`: statistics which are updated as the graph renders.
+
+    """
+    stats = GraphStats()
+    graph.buf = CountingLineBuilder(graph.column_colors, stats)
+
+    for name, state in OUTPUT_METHODS:
+        setattr(graph, name, _timed(getattr(graph, name), stats, name, state))
+    graph._walk = _timed(graph._walk, stats, 'walk')  # pylint: disable=protected-access
+    graph._sort = _timed_lazily(graph._sort, stats, 'sort')  # pylint: disable=protected-access
+    graph._incremental_sort = _timed_lazily(graph._incremental_sort, stats, 'sort')  # pylint: disable=protected-access
+
+    update = graph._update  # pylint: disable=protected-access
+
+    @wraps(update)
+    def update_peaks(commit):
+        update(commit)
+        stats.peak_num_columns = max(stats.peak_num_columns, graph.num_columns)
+        stats.peak_mapping_size = max(stats.peak_mapping_size, graph.mapping_size)
+    graph._update = update_peaks  # pylint: disable=protected-access
+
+    padding_line = graph._padding_line  # pylint: disable=protected-access
+
+    @wraps(padding_line)
+    def count_padding_line():
+        # Outside the commit state this outputs (and counts) the next line.
+        if graph.state == GraphState.COMMIT:
+            stats.rows[GraphState.PADDING] += 1
+        padding_line()
+    graph._padding_line = count_padding_line  # pylint: disable=protected-access
+
+    graph.outfile = CountingWriter(graph.outfile, stats)
+    return stats
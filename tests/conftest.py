@@ -3,6 +3,8 @@
 
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+import random
+
 import pytest
 
 from asciidag.graph import Graph
@@ -82,3 +84,17 @@ def tangled_nodes():
         Node("reach", parents=[tangle]),
     ])
     return [tip]
+
+
+@pytest.fixture
+def random_dag():
+    """Fixture to supply a builder of seeded random DAGs with merges, octopus merges and several tips."""
+    def build(size, seed):
+        rnd = random.Random(seed)
+        nodes = []
+        for i in range(size):
+            window = nodes[max(0, i - 10):]
+            num_parents = min(len(window), rnd.choice([0, 1, 1, 1, 1, 2, 2, 3]))
+            nodes.append(Node(str(i), parents=rnd.sample(window, num_parents)))
+        return [nodes[-1]] + rnd.sample(nodes, 3)
+    return build
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""Tests the arraydag module."""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import io
+import zlib
+
+import pytest
+
+from asciidag.graph import Graph
+from asciidag.node import Node
+from asciidag.sequence import walk_nodes, sort_in_topological_order
+
+np = pytest.importorskip("numpy")
+arraydag = pytest.importorskip("asciidag.arraydag")
+
+
+def test_from_edges():
+    """Test that edges are grouped by child, keeping their order."""
+    dag = arraydag.ArrayDAG.from_edges([2, 0, 2, 1], [1, 3, 0, 3], ["a", "b", "c", "d"])
+    assert dag.offsets.tolist() == [0, 1, 2, 4, 4]
+    assert list(dag.parents_of(2)) == [1, 0]
+    assert list(dag.parents_of(2, first_parent_only=True)) == [1]
+    assert dag.tips().tolist() == [2]
+    assert arraydag.once([3, 1, 3, 2, 1]).tolist() == [3, 1, 2]
+
+
+@pytest.mark.parametrize("seed", range(10))
+@pytest.mark.parametrize("first_parent_only", [False, True])
+@pytest.mark.parametrize("batch_size", [1, 3, 256])
+def test_same_order_as_nodes(random_dag, seed, first_parent_only, batch_size, monkeypatch):
+    """Test that the vectorised walk and sort match the node-by-node ones."""
+    monkeypatch.setattr(arraydag, "BATCH_SIZE", batch_size)
+    tips = random_dag(300, seed)
+    dag = arraydag.ArrayDAG.from_nodes(tips)
+    items = lambda indices: [dag.labels[i] for i in indices]  # noqa: E731
+
+    walked = list(walk_nodes(tips, first_parent_only))
+    tip_indices = list(range(len(set(tips))))
+    assert items(dag.walk(tip_indices, first_parent_only)) == [node.item for node in walked]
+    assert items(dag.topological_order(dag.walk(tip_indices, first_parent_only), first_parent_only)) == [
+        node.item for node in sort_in_topological_order(walked, first_parent_only)]
+
+
+@pytest.mark.parametrize("use_color", [True, False])
+def test_array_graph_is_identical(random_dag, tangled_nodes, use_color):
+    """Test that drawing from arrays writes what drawing the nodes does."""
+    tips = tangled_nodes + random_dag(100, 0)
+    expected = io.StringIO()
+    Graph(fh=expected, use_color=use_color).show_nodes(tips)
+
+    dag = arraydag.ArrayDAG.from_nodes(tips)
+    out = io.StringIO()
+    arraydag.ArrayGraph(dag, fh=out, use_color=use_color).show_nodes(dag.tips())
+    assert out.getvalue() == expected.getvalue()
+
+
+def test_array_graph_index_zero_parent():
+    """Test drawing a merge whose second parent is node 0, which is falsy."""
+    dag = arraydag.ArrayDAG.from_edges([1, 1], [2, 0], ["a", "m", "b"])
+    out = io.StringIO()
+    arraydag.ArrayGraph(dag, fh=out, use_color=False).show_nodes()
+
+    expected = io.StringIO()
+    Graph(fh=expected, use_color=False).show_nodes([Node("m", parents=[Node("b"), Node("a")])])
+    assert out.getvalue() == expected.getvalue()
+
+
+def test_array_graph_key_order(random_dag, tangled_nodes):
+    """Test that drawing from arrays in key order writes what drawing the nodes does."""
+    tips = tangled_nodes + random_dag(100, 1)
+    expected = io.StringIO()
+    Graph(fh=expected).show_nodes(tips, key=lambda node: zlib.crc32(node.item.encode("utf-8")) % 7)
+
+    dag = arraydag.ArrayDAG.from_nodes(tips)
+    out = io.StringIO()
+    tip_indices = list(range(len(set(tips))))
+    arraydag.ArrayGraph(dag, fh=out).show_nodes(
+        tip_indices, key=lambda index: zlib.crc32(dag.labels[index].encode("utf-8")) % 7)
+    assert out.getvalue() == expected.getvalue()
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""Tests the cache module."""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import io
+import os
+
+from asciidag.cache import RenderCache, fingerprint
+from asciidag.graph import Graph
+from asciidag.node import Node
+
+
+def diamond(tip="d"):
+    """Build a small DAG with a merge."""
+    root = Node("a")
+    return [Node(tip, parents=[Node("b", parents=[root]), Node("c", parents=[root])])]
+
+
+def test_fingerprint():
+    """Test that fingerprints depend on structure and items but not node identity."""
+    assert fingerprint(diamond()) == fingerprint(diamond())
+    assert fingerprint(diamond()) != fingerprint(diamond("e"))
+    swapped = diamond()
+    swapped[0].parents = swapped[0].parents[::-1]
+    assert fingerprint(diamond()) != fingerprint(swapped)
+
+
+def test_fingerprint_is_unambiguous():
+    """Test that items of different types or split differently do not collide."""
+    assert fingerprint([Node(1)]) != fingerprint([Node("1")])
+    assert fingerprint([Node("ab", parents=[Node("c")])]) != fingerprint([Node("a", parents=[Node("bc")])])
+    assert fingerprint([Node("a"), Node("b")]) != fingerprint([Node("a", parents=[Node("b")])])
+
+
+def test_memory_tier(tangled_nodes):
+    """Test hits, misses and least recently used eviction in memory."""
+    cache = RenderCache(maxsize=2)
+    expected = io.StringIO()
+    Graph(fh=expected, use_color=False).show_nodes(tangled_nodes)
+
+    assert cache.render(tangled_nodes, use_color=False) == expected.getvalue()
+    assert cache.render(tangled_nodes, use_color=False) == expected.getvalue()
+    assert cache.info() == {"hits": 1, "disk_hits": 0, "misses": 1, "size": 1}
+
+    cache.render(tangled_nodes)
+    cache.render(diamond())
+    cache.render(tangled_nodes)
+    assert cache.info() == {"hits": 2, "disk_hits": 0, "misses": 3, "size": 2}
+    cache.render(tangled_nodes, use_color=False)
+    assert cache.misses == 4
+
+
+def test_disk_tier(tmpdir, tangled_nodes):
+    """Test that renders survive in the on-disk tier, which is bounded in size."""
+    directory = str(tmpdir.join("cache"))
+    text = RenderCache(directory=directory).render(tangled_nodes)
+
+    cache = RenderCache(maxsize=1, directory=directory)
+    assert cache.render(tangled_nodes) == text
+    assert cache.info() == {"hits": 0, "disk_hits": 1, "misses": 0, "size": 1}
+
+    cache = RenderCache(directory=directory, max_disk_bytes=len(text.encode("utf-8")))
+    cache.render(diamond())
+    assert len(os.listdir(directory)) == 1
+
+    cache.render(diamond("e"))
+    assert len(os.listdir(directory)) == 2
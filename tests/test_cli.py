@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""Tests the cli module."""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import pytest
+
+from asciidag.cli import main
+
+EXPECTED = "*   d\n|\\  \n* | b\n| * c\n|/  \n* a\n"
+
+
+def test_parents(tmpdir, capfd):
+    """Test drawing a rev-list style file."""
+    path = tmpdir.join("rev-list")
+    path.write("d b c\nb a\nc a\na\n")
+    assert main(["--no-color", str(path)]) == 0
+    assert capfd.readouterr()[0] == EXPECTED
+
+    assert main(["--no-color", "--sorted", "--limit", "2", str(path)]) == 0
+    assert capfd.readouterr()[0] == "*   d\n|\\  \n* | b\n"
+
+    assert main(["--no-color", "--jobs", "2", str(path)]) == 0
+    assert capfd.readouterr()[0] == EXPECTED
+
+
+def test_json(tmpdir, capfd):
+    """Test drawing a JSON adjacency file."""
+    path = tmpdir.join("dag.json")
+    path.write('{"d": ["b", "c"], "b": ["a"], "c": ["a"]}')
+    assert main(["--no-color", "--format", "json", str(path)]) == 0
+    assert capfd.readouterr()[0] == EXPECTED
+
+    assert main(["--no-color", "--format", "json", "--first-parent", str(path)]) == 0
+    assert capfd.readouterr()[0].splitlines()[:2] == ["* d", "* b"]
+
+
+@pytest.mark.parametrize("content, items", [
+    ("d b c\nb a\nc a\na\n", ["d", "b", "a"]),
+    ("e d\nx c\nd b c\nb a\nc a\na\n", ["e", "x", "d", "c", "b", "a"]),
+])
+def test_sorted_first_parent(tmpdir, capfd, content, items):
+    """Test that first-parent mode shows the same nodes whether or not the input is sorted."""
+    path = tmpdir.join("rev-list")
+    path.write(content)
+    for sorted_flag in ([], ["--sorted"]):
+        assert main(["--no-color", "--first-parent"] + sorted_flag + [str(path)]) == 0
+        lines = capfd.readouterr()[0].splitlines()
+        assert sorted(line.split()[-1] for line in lines if "*" in line) == sorted(items)
+
+
+def test_negative_limit(tmpdir, capfd):
+    """Test that a negative limit is rejected as a usage error."""
+    path = tmpdir.join("rev-list")
+    path.write("a\n")
+    with pytest.raises(SystemExit) as excinfo:
+        main(["--limit", "-1", str(path)])
+    assert excinfo.value.code == 2
+    assert "must not be negative" in capfd.readouterr()[1]
+
+
+@pytest.mark.parametrize("options, use_file", [
+    (["--jobs", "0"], True),
+    (["--jobs", "2"], False),
+    (["--jobs", "2", "--sorted"], True),
+    (["--jobs", "2", "--format", "json"], True),
+])
+def test_jobs_usage(tmpdir, capfd, options, use_file):
+    """Test that --jobs is rejected where the input would not be parsed in worker processes."""
+    path = tmpdir.join("rev-list")
+    path.write("a\n")
+    with pytest.raises(SystemExit) as excinfo:
+        main(options + [str(path) if use_file else "-"])
+    assert excinfo.value.code == 2
+    assert "--jobs" in capfd.readouterr()[1]
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""Tests the commitgraph module."""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import io
+import os
+import subprocess
+
+import pytest
+
+from asciidag.commitgraph import CommitGraph, InvalidCommitGraphException
+from asciidag.graph import Graph
+from asciidag.loader import load
+from asciidag.sequence import generation_numbers
+
+
+def has_git():
+    """Return whether the git binary can be run."""
+    try:
+        subprocess.check_output(["git", "--version"])
+    except (OSError, subprocess.CalledProcessError):
+        return False
+    return True
+
+
+pytestmark = pytest.mark.skipif(not has_git(), reason="git is not installed")
+
+
+class Repository(object):  # pylint: disable=bad-option-value,useless-object-inheritance
+    """A scratch Git repository driven through the git binary."""
+
+    def __init__(self, path):
+        """Initialise a repository at the path."""
+        self.path = str(path)
+        self.env = dict(os.environ, GIT_AUTHOR_NAME="A", GIT_AUTHOR_EMAIL="a@example.com",
+                        GIT_COMMITTER_NAME="A", GIT_COMMITTER_EMAIL="a@example.com",
+                        GIT_CONFIG_NOSYSTEM="1", HOME=self.path)
+        # init -b needs git 2.28, so name the branch separately.
+        self.git("init", "-q")
+        self.git("symbolic-ref", "HEAD", "refs/heads/main")
+        self.count = 0
+
+    def git(self, *args):
+        """Run git in the repository and return its output."""
+        return subprocess.check_output(("git",) + args, cwd=self.path, env=self.env).decode("ascii")
+
+    def commit(self, *parents):
+        """Create a commit with the given parents (default: none) and return its id."""
+        self.count += 1
+        tree = self.git("write-tree").strip()
+        args = ["commit-tree", tree, "-m", "commit {}".format(self.count)]
+        for parent in parents:
+            args.extend(["-p", parent])
+        self.env["GIT_AUTHOR_DATE"] = self.env["GIT_COMMITTER_DATE"] = "{} +0000".format(1600000000 + self.count)
+        return self.git(*args).strip()
+
+    def rev_list(self, tips):
+        """Return the text of git rev-list --parents for the tips."""
+        return self.git("rev-list", "--parents", *tips)
+
+
+def build_history(repo):
+    """Create a history with merges, an octopus merge and two roots."""
+    root = repo.commit()
+    a = repo.commit(root)
+    b = repo.commit(root)
+    c = repo.commit(a)
+    other_root = repo.commit()
+    merge = repo.commit(c, b)
+    octopus = repo.commit(merge, a, b, other_root)
+    tip = repo.commit(octopus)
+    return [tip, c]
+
+
+def assert_matches_rev_list(repo, tips):
+    """Check the commit-graph gives the same nodes and drawing as git rev-list."""
+    expected_nodes = load(io.StringIO(repo.rev_list(tips)))
+    with CommitGraph(repo.path) as graph:
+        nodes, generations = graph.load()
+        assert set(nodes) == set(expected_nodes)
+        for oid, node in nodes.items():
+            assert [parent.item for parent in node.parents] == [
+                parent.item for parent in expected_nodes[oid].parents]
+        tip_nodes = [nodes[tip] for tip in tips]
+        assert generations == generation_numbers(tip_nodes)
+        assert graph.position(tips[0]) is not None
+        assert graph.oid(graph.position(tips[0])) == tips[0]
+        assert graph.position("0" * 40) is None
+
+        expected = io.StringIO()
+        Graph(fh=expected).show_nodes([expected_nodes[tip] for tip in tips])
+        actual = io.StringIO()
+        Graph(fh=actual).show_nodes(tip_nodes, generations=generations)
+        assert actual.getvalue() == expected.getvalue()
+
+
+def test_single_file(tmp_path):
+    """Test reading a single commit-graph file, including extra edges."""
+    repo = Repository(tmp_path)
+    tips = build_history(repo)
+    repo.git("update-ref", "refs/heads/main", tips[0])
+    repo.git("commit-graph", "write", "--reachable")
+    assert_matches_rev_list(repo, tips)
+    with CommitGraph(repo.path) as graph:
+        octopus = graph.position(repo.git("rev-parse", tips[0] + "^").strip())
+        assert len(graph.parents(octopus)) == 4
+        assert graph.layers[0].extra_edges is not None
+
+
+def test_split_chain(tmp_path):
+    """Test reading a chain of split commit-graph files."""
+    repo = Repository(tmp_path)
+    first_tips = build_history(repo)
+    repo.git("update-ref", "refs/heads/main", first_tips[0])
+    repo.git("commit-graph", "write", "--reachable", "--split")
+    merge = repo.commit(first_tips[0], repo.commit(first_tips[1]))
+    tips = [repo.commit(merge, repo.commit(first_tips[0]), first_tips[1])]
+    repo.git("update-ref", "refs/heads/main", tips[0])
+    repo.git("commit-graph", "write", "--reachable", "--split=no-merge")
+    assert not os.path.exists(os.path.join(repo.path, ".git", "objects", "info", "commit-graph"))
+    with CommitGraph(repo.path) as graph:
+        assert len(graph.layers) == 2
+    assert_matches_rev_list(repo, tips)
+
+
+def test_missing(tmp_path):
+    """Test that a repository without a commit-graph is reported."""
+    repo = Repository(tmp_path)
+    with pytest.raises(InvalidCommitGraphException):
+        CommitGraph(repo.path)
+
+
+def test_empty(tmp_path):
+    """Test that an empty commit-graph file, alone or as a layer of a chain, is reported."""
+    repo = Repository(tmp_path)
+    info = os.path.join(repo.path, ".git", "objects", "info")
+    io.open(os.path.join(info, "commit-graph"), "wb").close()
+    with pytest.raises(InvalidCommitGraphException):
+        CommitGraph(repo.path)
+
+    os.remove(os.path.join(info, "commit-graph"))
+    os.mkdir(os.path.join(info, "commit-graphs"))
+    with io.open(os.path.join(info, "commit-graphs", "commit-graph-chain"), "w", encoding="ascii") as fh:
+        fh.write("0" * 40 + "\n")
+    io.open(os.path.join(info, "commit-graphs", "graph-{}.graph".format("0" * 40)), "wb").close()
+    with pytest.raises(InvalidCommitGraphException):
+        CommitGraph(repo.path)
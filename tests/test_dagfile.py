@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""Tests the dagfile module."""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import io
+
+import pytest
+
+from asciidag.graph import Graph
+from asciidag.node import Node
+from asciidag.sequence import generation_numbers
+
+np = pytest.importorskip("numpy")
+arraydag = pytest.importorskip("asciidag.arraydag")
+dagfile = pytest.importorskip("asciidag.dagfile")
+
+
+def test_round_trip(tangled_nodes, tmp_path):
+    """Test that a mapped DAG file draws what the nodes do."""
+    tips = tangled_nodes + [Node("ünïcode", parents=[tangled_nodes[0]])]
+    path = str(tmp_path / "tangled.dag")
+    dag = arraydag.ArrayDAG.from_nodes(tips)
+    dagfile.write_dagfile(path, dag)
+
+    expected = io.StringIO()
+    Graph(fh=expected).show_nodes(tips)
+    with dagfile.DagFile(path) as mapped:
+        assert len(mapped.dag) == len(dag)
+        assert list(mapped.dag.labels[i] for i in range(len(dag))) == dag.labels
+        generations = generation_numbers(tips)
+        index = dict((item, i) for i, item in enumerate(dag.labels))
+        assert all(mapped.dag.generations[index[node.item]] == generation for node, generation in generations.items())
+
+        out = io.StringIO()
+        arraydag.ArrayGraph(mapped.dag, fh=out).show_nodes()
+        assert out.getvalue() == expected.getvalue()
+
+        out = io.StringIO()
+        arraydag.ArrayGraph(mapped.dag, fh=out).show_nodes(max_count=3)
+        assert out.getvalue().count("*") == 3
+
+
+def test_invalid(tmp_path):
+    """Test that other files, truncated files and empty files are rejected."""
+    path = tmp_path / "bad.dag"
+    path.write_bytes(b"not a DAG file at all, but long enough for a header")
+    with pytest.raises(dagfile.InvalidDagFileException):
+        dagfile.DagFile(str(path))
+
+    good = str(tmp_path / "good.dag")
+    dagfile.write_dagfile(good, arraydag.ArrayDAG.from_nodes([Node.from_list("b", "a")]))
+    with io.open(good, "rb") as fh:
+        path.write_bytes(fh.read()[:-3])
+    with pytest.raises(dagfile.InvalidDagFileException):
+        dagfile.DagFile(str(path))
+
+    path.write_bytes(b"")
+    with pytest.raises(dagfile.InvalidDagFileException):
+        dagfile.DagFile(str(path))
+
+
+def test_labels(tmp_path):
+    """Test that labels of any type round-trip as text."""
+    path = str(tmp_path / "labels.dag")
+    dagfile.write_dagfile(path, arraydag.ArrayDAG.from_edges([0, 1], [1, 2], [1, "café ☕", b"raw"]))
+    mapped = dagfile.DagFile(path)
+    assert [mapped.dag.labels[i] for i in range(3)] == ["1", "café ☕", "raw"]
+    assert mapped.close()
+
+
+def test_close_with_views(tmp_path):
+    """Test that closing while arrays are referenced keeps the file mapped and says so."""
+    path = str(tmp_path / "chain.dag")
+    dagfile.write_dagfile(path, arraydag.ArrayDAG.from_nodes([Node.from_list("b", "a")]))
+    mapped = dagfile.DagFile(path)
+    offsets = mapped.dag.offsets
+    assert not mapped.close()
+    assert offsets.tolist() == [0, 1, 1]
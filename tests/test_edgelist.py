@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""Tests the edgelist module."""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import io
+
+import pytest
+
+from asciidag.edgelist import parse_edges
+from asciidag.graph import Graph
+from asciidag.loader import load, load_file
+
+REV_LIST = """\
+h g f
+g e
+f e d
+e c
+d c b
+c a
+
+b a
+a
+"""
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+@pytest.mark.parametrize("chunk_bytes", [1, 7, 1 << 20])
+def test_same_as_load(tmpdir, processes, chunk_bytes):
+    """Test that chunked parsing gives the nodes loading gives, in the same order."""
+    path = tmpdir.join("rev-list")
+    path.write(REV_LIST)
+    table = parse_edges(str(path), processes, chunk_bytes)
+    assert table.ids == ["h", "g", "f", "e", "d", "c", "b", "a"]
+    assert len(table.children) == len(table.parents) == 10
+
+    expected = load(io.StringIO(REV_LIST), labels={"a": "initial"})
+    nodes = table.nodes(labels={"a": "initial"})
+    assert list(nodes) == list(expected)
+    for node_id, node in nodes.items():
+        assert node.item == expected[node_id].item
+        assert [parent.item for parent in node.parents] == [parent.item for parent in expected[node_id].parents]
+
+    loaded = io.StringIO()
+    Graph(fh=loaded).show_nodes([expected["h"]])
+    parsed = io.StringIO()
+    Graph(fh=parsed).show_nodes([nodes["h"]])
+    assert parsed.getvalue() == loaded.getvalue()
+
+
+def test_line_separators(tmpdir):
+    """Test that only newlines end lines, as for the loader, whatever else splitlines() splits on."""
+    path = tmpdir.join("rev-list")
+    path.write_text("c b\x0ca\r\nb\u2028a\x1cz\na\x85\n", encoding="utf-8")
+    expected = load_file(str(path))
+    for processes in (1, 2):
+        nodes = parse_edges(str(path), processes, chunk_bytes=4).nodes()
+        assert list(nodes) == list(expected)
+        for node_id, node in nodes.items():
+            assert [parent.item for parent in node.parents] == [parent.item for parent in expected[node_id].parents]
+
+
+def test_empty(tmpdir):
+    """Test that an empty file has no ids."""
+    path = tmpdir.join("empty")
+    path.write("")
+    assert parse_edges(str(path)).ids == []
+
+
+def test_array_dag(tmpdir):
+    """Test building an ArrayDAG from the tables."""
+    arraydag = pytest.importorskip("asciidag.arraydag")
+    path = tmpdir.join("rev-list")
+    path.write(REV_LIST)
+    dag = parse_edges(str(path), 1).array_dag()
+    out = io.StringIO()
+    arraydag.ArrayGraph(dag, fh=out).show_nodes()
+    expected = io.StringIO()
+    Graph(fh=expected).show_nodes([load(io.StringIO(REV_LIST))["h"]])
+    assert out.getvalue() == expected.getvalue()
+
+
+def test_array_dag_parent_before_child(tmpdir):
+    """Test drawing an ArrayDAG whose first id, index 0, is the second parent of a merge."""
+    arraydag = pytest.importorskip("asciidag.arraydag")
+    content = "b\nm a b\na\n"
+    path = tmpdir.join("rev-list")
+    path.write(content)
+    dag = parse_edges(str(path), 1).array_dag()
+    out = io.StringIO()
+    arraydag.ArrayGraph(dag, fh=out).show_nodes()
+    expected = io.StringIO()
+    Graph(fh=expected).show_nodes([load(io.StringIO(content))["m"]])
+    assert out.getvalue() == expected.getvalue()
@@ -3,9 +3,14 @@
 
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+import io
+import re
+
 import pytest
 
-from asciidag.graph import Graph
+from asciidag.graph import Column, Graph, LineBuilder
+from asciidag.node import Node
+from asciidag.sequence import generation_numbers
 
 
 def verify_out(capfd, expected):
@@ -91,3 +96,156 @@ def test_tangled(tangled_nodes, capfd):
 |/
 * second
 * initial""")
+
+
+def test_sorted_nodes_streamed(simple_nodes):
+    """Test that pre-sorted nodes are written as soon as they are consumed."""
+    out = io.StringIO()
+    graph = Graph(fh=out, use_color=False)
+
+    def stream():
+        node = simple_nodes[0]
+        while node is not None:
+            yield node
+            assert out.getvalue().endswith("* {}\n".format(node.item))
+            node = node.parents[0] if node.parents else None
+
+    graph.show_sorted_nodes(stream())
+    assert out.getvalue().splitlines() == ["* " + item for item in (
+        "Second", "sixth", "fifth", "fourth", "third", "second", "initial")]
+
+
+def test_iter_lines(branched_nodes, capfd):
+    """Test that the lines generated match those written."""
+    lines = list(Graph(use_color=False).iter_lines(branched_nodes))
+    assert lines[:3] == [("*   ", branched_nodes[0]), ("|\\  ", None), ("* | ", branched_nodes[0].parents[0])]
+    assert [node.item for _, node in lines if node is not None] == [
+        "Merge branch 'side'", "Second", "side-2", "sixth", "side-1", "fifth", "fourth", "third", "second", "initial"]
+
+    Graph(use_color=False).show_nodes(branched_nodes)
+    verify_out(capfd, "".join(prefix + (node.item if node else "") + "\n" for prefix, node in lines))
+
+
+def test_line_builder():
+    """Test that adjacent glyphs of the same color share one color code and reset."""
+    builder = LineBuilder(["<red>", "<green>", "<reset>"])
+    builder.write_column(0, "_")
+    builder.write_column(0, "_")
+    builder.write_column(1, "/")
+    builder.write(" ")
+    builder.write_column(None, "|")
+    builder.write_column(1, "|")
+    assert builder.getvalue() == "<red>__<reset><green>/<reset> |<green>|<reset>"
+    assert builder.getvalue() == ""
+
+
+def test_color_matches_plain(tangled_nodes):
+    """Test that colored output differs from plain output only by color codes."""
+    plain = io.StringIO()
+    Graph(fh=plain, use_color=False).show_nodes(tangled_nodes)
+    colored = io.StringIO()
+    Graph(fh=colored, use_color=True).show_nodes(tangled_nodes)
+    assert re.sub(r"\x1b\[[0-9;]*m", "", colored.getvalue()) == plain.getvalue()
+
+
+def test_octopus_merge_into_existing_column():
+    """Test that the dashes of an octopus merge lead to a parent that already has a column to its left."""
+    root = Node("root")
+    side_a = Node("a", parents=[root])
+    side_b = Node("b", parents=[root])
+    merge = Node("merge", parents=[side_a, side_b, root])
+    nodes = [Node("other", parents=[root]), merge, side_a, side_b, root]
+
+    plain = io.StringIO()
+    Graph(fh=plain, use_color=False).show_sorted_nodes(nodes)
+    assert [line.rstrip() for line in plain.getvalue().splitlines()] == [
+        "* other",
+        "| *-.   merge",
+        "| |\\ \\",
+        "| |_|/",
+        "|/| |",
+        "| * | a",
+        "|/ /",
+        "| * b",
+        "|/",
+        "* root",
+    ]
+
+    colored = io.StringIO()
+    Graph(fh=colored).show_sorted_nodes(nodes)
+    # The dashes are drawn in the color of root's column, the first one.
+    assert colored.getvalue().splitlines()[1].startswith("\x1b[31m|\x1b[m *\x1b[31m-.\x1b[m")
+
+
+def test_column_index():
+    """Test that the commit to column index maps follow the columns on wide graphs."""
+    tips = []
+    for i in range(200):
+        tips.append(Node("tip-{}".format(i), parents=[Node("base-{}".format(i))]))
+    graph = Graph(use_color=False)
+    shown = 0
+    for _, node in graph.iter_lines(tips):
+        if node is not None:
+            shown += 1
+            assert graph.column_index == {graph.columns[i].commit: i for i in range(graph.num_columns)}
+            assert graph.new_column_index == {graph.new_columns[i].commit: i for i in range(graph.num_new_columns)}
+    assert shown == 400
+
+
+def test_column_storage(tangled_nodes):
+    """Test that column storage is slotted and grows geometrically."""
+    assert not hasattr(Column(None, None), "__dict__")
+
+    graph = Graph(use_color=False)
+    graph.show_nodes(tangled_nodes)
+    assert graph.column_capacity == 30
+    assert len(graph.columns) == len(graph.new_columns) == 30
+    assert len(graph.mapping) == len(graph.new_mapping) == 60
+
+    graph._ensure_capacity(31)  # pylint: disable=protected-access
+    assert graph.column_capacity == 60
+    assert len(graph.mapping) == 120
+
+
+def test_first_parent(branched_nodes, capfd):
+    """Test that side branches are not shown in first-parent mode."""
+    graph = Graph(use_color=False, first_parent_only=True)
+    graph.show_nodes(branched_nodes)
+    verify_out(capfd, "".join("* {}\n".format(item) for item in (
+        "Merge branch 'side'", "Second", "sixth", "fifth", "fourth", "third", "second", "initial")))
+
+
+def test_max_count(tangled_nodes):
+    """Test that limiting the nodes shown truncates the full output."""
+    full = list(Graph(use_color=False).iter_lines(tangled_nodes))
+    generations = generation_numbers(tangled_nodes)
+    assert list(Graph(use_color=False).iter_lines(tangled_nodes, generations=generations)) == full
+    for max_count in (1, 5, 12):
+        limited = list(Graph(use_color=False).iter_lines(tangled_nodes, max_count=max_count))
+        assert len([node for _, node in limited if node is not None]) == max_count
+        assert limited == full[:len(limited)]
+        assert list(Graph(use_color=False).iter_lines(
+            tangled_nodes, max_count=max_count, generations=generations)) == limited
+
+
+def test_key_order(capfd):
+    """Test that a key interleaves branches like git log --date-order."""
+    dates = {}
+
+    def commit(item, date, parents=()):
+        node = Node(item, parents=list(parents))
+        dates[node] = date
+        return node
+
+    root = commit("root", 0)
+    main = commit("main-2", 2, [commit("main-1", 1, [root])])
+    side = commit("side-2", 4, [commit("side-1", 3, [root])])
+    tip = commit("merge", 5, [main, side])
+
+    Graph(use_color=False).show_nodes([tip])
+    assert [line.split()[-1] for line in capfd.readouterr()[0].splitlines() if "*" in line] == [
+        "merge", "main-2", "side-2", "main-1", "side-1", "root"]
+
+    Graph(use_color=False).show_nodes([tip], key=dates.get, generations=generation_numbers([tip]))
+    assert [line.split()[-1] for line in capfd.readouterr()[0].splitlines() if "*" in line] == [
+        "merge", "side-2", "side-1", "main-2", "main-1", "root"]
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""Tests the loader module."""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import io
+
+from asciidag.graph import Graph
+from asciidag.loader import IncrementalLoader, load, load_file, stream
+
+REV_LIST = """\
+d b c
+b a
+c a
+a
+"""
+
+
+def test_load():
+    """Test that nodes are shared by id and labelled from the side map."""
+    nodes = load(io.StringIO(REV_LIST), labels={"d": "Merge", "a": "initial"})
+    assert list(nodes) == ["d", "b", "c", "a"]
+    assert [node.item for node in nodes.values()] == ["Merge", "b", "c", "initial"]
+    assert nodes["d"].parents == (nodes["b"], nodes["c"])
+    assert nodes["b"].parents == nodes["c"].parents == (nodes["a"],)
+    assert nodes["a"].parents == ()
+
+
+def test_load_boundary():
+    """Test that parents without lines of their own become parentless nodes."""
+    nodes = load(io.BytesIO(b"c b\n\nb a\n"))
+    assert list(nodes) == ["c", "b", "a"]
+    assert nodes["a"].parents == ()
+
+
+def test_load_file(tmpdir):
+    """Test loading through a memory map."""
+    path = tmpdir.join("rev-list")
+    path.write(REV_LIST)
+    nodes = load_file(str(path))
+    assert nodes["d"].parents == (nodes["b"], nodes["c"])
+    assert nodes["b"].parents == nodes["c"].parents == (nodes["a"],)
+
+    empty = tmpdir.join("empty")
+    empty.write("")
+    assert load_file(str(empty)) == {}
+
+
+def test_stream():
+    """Test that streamed nodes render the same as loaded nodes."""
+    loaded = io.StringIO()
+    Graph(fh=loaded, use_color=False).show_nodes(list(load(io.StringIO(REV_LIST)).values()))
+    streamed = io.StringIO()
+    Graph(fh=streamed, use_color=False).show_sorted_nodes(stream(io.StringIO(REV_LIST)))
+    assert streamed.getvalue() == loaded.getvalue()
+    assert streamed.getvalue().splitlines()[0] == "*   d"
+
+
+def test_feed_pages():
+    """Test that feeding pages of lines draws the same as drawing them all at once."""
+    lines = "g f e\nf d\ne d\nd c\nc b a\nb a\na\n".splitlines()
+    whole = io.StringIO()
+    Graph(fh=whole, use_color=False).show_sorted_nodes(stream(lines))
+
+    loader = IncrementalLoader()
+    paged = io.StringIO()
+    graph = Graph(fh=paged, use_color=False)
+    for start in range(0, len(lines), 2):
+        graph.feed(loader.feed(lines[start:start + 2]))
+        assert set(loader.pending) <= set("abcdef")
+    assert not loader.pending
+    assert paged.getvalue() == whole.getvalue()
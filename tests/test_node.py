@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""Tests the node module."""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import pytest
+
+from asciidag.node import InvalidNodeException, Node
+
+
+def test_parents_tuple():
+    """Test that parents are stored as a tuple without a per-node dict."""
+    root = Node("root")
+    node = Node("child", parents=[root])
+    assert root.parents == ()
+    assert node.parents == (root,)
+    assert not hasattr(node, "__dict__")
+    assert repr(root).endswith(", parents=())")
+
+
+def test_invalid_parents():
+    """Test that non-iterable parents are rejected."""
+    with pytest.raises(InvalidNodeException):
+        Node("child", parents=1)
+
+
+def test_from_list():
+    """Test building a linear chain from a list."""
+    node = Node.from_list("c", "b", "a")
+    assert [node.item, node.parents[0].item, node.parents[0].parents[0].item] == ["c", "b", "a"]
+    assert node.parents[0].parents[0].parents == ()
+
+
+def test_from_dict():
+    """Test building nodes from a nested dict."""
+    nodes = Node.from_dict({"c": {"b": {"a": {}}, "x": {}}})
+    assert [node.item for node in nodes] == ["c"]
+    assert [parent.item for parent in nodes[0].parents] == ["b", "x"]
+    assert nodes[0].parents[0].parents[0].item == "a"
+
+
+def test_from_list_deep():
+    """Test that long chains do not hit the recursion limit."""
+    node = Node.from_list(*range(20000))
+    depth = 1
+    while node.parents:
+        node = node.parents[0]
+        depth += 1
+    assert depth == 20000
+    assert node.item == 19999
+
+
+def test_from_dict_deep():
+    """Test that deeply nested dicts do not hit the recursion limit."""
+    dct = {}
+    for i in range(20000):
+        dct = {i: dct}
+    node = Node.from_dict(dct)[0]
+    assert node.item == 19999
+    while node.parents:
+        node = node.parents[0]
+    assert node.item == 0
+
+
+def test_from_edges():
+    """Test that nodes are shared by item when building from an edge list."""
+    nodes = Node.from_edges([("d", "b"), ("d", "c"), ("b", "a"), ("c", "a")])
+    assert list(nodes) == ["d", "b", "c", "a"]
+    assert nodes["d"].parents == (nodes["b"], nodes["c"])
+    assert nodes["b"].parents == nodes["c"].parents == (nodes["a"],)
+    assert nodes["a"].parents == ()
+
+
+def test_from_adjacency():
+    """Test that nodes are shared by item when building from an adjacency mapping."""
+    nodes = Node.from_adjacency({"d": ["b", "c"], "b": ["a"], "c": ["a"], "e": []})
+    assert list(nodes) == ["d", "b", "c", "a", "e"]
+    assert nodes["d"].parents == (nodes["b"], nodes["c"])
+    assert nodes["b"].parents == nodes["c"].parents == (nodes["a"],)
+    assert nodes["a"].parents == nodes["e"].parents == ()
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""Tests the paging module."""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import pytest
+
+from asciidag.graph import Graph
+from asciidag.paging import CheckpointIndex
+from asciidag.sequence import sort_in_topological_order, walk_nodes
+
+
+def test_seek(tangled_nodes):
+    """Test that seeking to any row produces the same lines as rendering from the start."""
+    nodes = list(sort_in_topological_order(list(walk_nodes(tangled_nodes))))
+    full = list(Graph().iter_sorted_lines(nodes))
+
+    index = CheckpointIndex(interval=5)
+    assert list(index.iter_lines(Graph(), nodes)) == full
+    assert len(index.checkpoints) > 3
+    assert [checkpoint.row for checkpoint in index.checkpoints[:2]] == [0, 6]
+
+    for row in range(len(full) + 1):
+        assert list(index.seek(Graph(), nodes, row)) == full[row:]
+
+
+def test_seek_errors(tangled_nodes):
+    """Test that seeking an empty index or a negative row raises a clear error."""
+    nodes = list(sort_in_topological_order(list(walk_nodes(tangled_nodes))))
+    index = CheckpointIndex()
+    with pytest.raises(ValueError, match="indexed"):
+        index.seek(Graph(), nodes, 0)
+
+    for _ in index.iter_lines(Graph(), nodes):
+        pass
+    with pytest.raises(IndexError, match="negative"):
+        index.seek(Graph(), nodes, -1)
+
+
+def test_snapshot_restore(tangled_nodes):
+    """Test that restoring a snapshot into another graph reproduces its state."""
+    graph = Graph()
+    lines = graph.iter_lines(tangled_nodes)
+    for _ in range(20):
+        next(lines)
+    snapshot = graph.snapshot()
+    assert snapshot.state == graph.state and len(snapshot.columns) == graph.num_columns
+
+    other = Graph()
+    other.restore(snapshot)
+    assert other.snapshot() == snapshot
+    assert other.column_index == graph.column_index
+    assert other.new_column_index == graph.new_column_index
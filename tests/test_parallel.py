@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""Tests the parallel module."""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import io
+
+from asciidag.graph import Graph
+from asciidag.node import Node
+from asciidag.parallel import flatten, iter_components, show_components, unflatten
+
+
+def histories():
+    """Build three unrelated histories, one of them with two tips."""
+    first = Node.from_list("a3", "a2", "a1")
+    base = Node("b1")
+    second = Node("b-merge", parents=[Node("b2", parents=[base]), Node("b-side", parents=[base])])
+    third = Node.from_list("c2", "c1")
+    return [first, second, third, Node("b-tip", parents=[second])]
+
+
+def test_flatten_round_trip():
+    """Test that flattening keeps items, edges and tips."""
+    tips = histories()
+    copies = unflatten(*flatten(tips))
+    expected = io.StringIO()
+    Graph(fh=expected, use_color=False).show_nodes(tips)
+    actual = io.StringIO()
+    Graph(fh=actual, use_color=False).show_nodes(copies)
+    assert actual.getvalue() == expected.getvalue()
+
+
+def test_components_in_order():
+    """Test that components in workers match rendering them one after another."""
+    tips = histories()
+    expected = io.StringIO()
+    graph = Graph(fh=expected, use_color=False)
+    for component in ([tips[0]], [tips[1], tips[3]], [tips[2]]):
+        graph.show_nodes(component)
+
+    for processes in (1, 2):
+        assert "".join(iter_components(tips, processes, use_color=False)) == expected.getvalue()
+
+    out = io.StringIO()
+    show_components(Graph(fh=out, use_color=False), tips, processes=2)
+    assert out.getvalue() == expected.getvalue()
+
+
+def test_components_first_parent():
+    """Test that only first-parent edges are sent to the workers."""
+    tips = histories()
+    text = "".join(iter_components(tips, 2, use_color=False, first_parent_only=True))
+    assert "b-side" not in text
+    assert text.count("*") == 9
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+"""Tests the reuse module."""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+from asciidag.graph import Graph
+from asciidag.node import Node
+from asciidag.reuse import ReusingRenderer
+
+
+def test_new_tips(tangled_nodes):
+    """Test that re-rendering with new tips splices in the previous tail."""
+    renderer = ReusingRenderer(use_color=False)
+    assert renderer.render(tangled_nodes) == list(Graph(use_color=False).iter_lines(tangled_nodes))
+    assert renderer.reused_lines == 0
+
+    for i in range(3):
+        tips = [Node("new-{}".format(i), parents=tangled_nodes)]
+        lines = renderer.render(tips)
+        assert lines == list(Graph(use_color=False).iter_lines(tips))
+        assert 0 < renderer.reused_lines < len(lines)
+        tangled_nodes = tips
+
+    side = Node("side", parents=[tangled_nodes[0].parents[0].parents[0]])
+    tips = tangled_nodes + [side]
+    assert renderer.render(tips) == list(Graph(use_color=False).iter_lines(tips))
+
+
+def test_long_chain():
+    """Test that a new tip on a long chain renders only the first nodes and splices in the rest."""
+    tip = Node.from_list(*["commit {}".format(i) for i in range(5000)])
+    renderer = ReusingRenderer(use_color=False)
+    renderer.render([tip])
+    new_tip = Node("new", parents=[tip])
+    lines = renderer.render([new_tip])
+    assert lines == list(Graph(use_color=False).iter_lines([new_tip]))
+    assert renderer.reused_lines == len(lines) - 2
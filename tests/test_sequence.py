@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""Tests the sequence module."""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import io
+import random
+from itertools import islice
+
+import pytest
+from benchmarks.generators import diamond_ladder, linear_chain
+
+from asciidag.graph import Graph
+from asciidag.node import Node
+from asciidag.sequence import (
+    generation_numbers, incremental_topological_order, walk_nodes, sort_in_key_order, sort_in_topological_order,
+    weakly_connected_components)
+
+
+class CountingNode(Node):
+    """Node that counts how many times its parents are expanded."""
+
+    expansions = 0
+
+    @property
+    def parents(self):
+        """Count each access to the parents of this node."""
+        CountingNode.expansions += 1
+        return self._parents
+
+    @parents.setter
+    def parents(self, parents):
+        self._parents = parents  # pylint: disable=attribute-defined-outside-init
+
+
+def test_walk_nodes_unique():
+    """Each node is walked exactly once however many paths lead to it."""
+    tips = diamond_ladder(31)
+    nodes = list(walk_nodes(tips + tips))
+    assert len(nodes) == 31
+    assert len(set(nodes)) == len(nodes)
+    assert nodes[0] is tips[0]
+    assert nodes[-1].item == "root"
+
+
+@pytest.mark.parametrize("rungs", [10, 100, 1000, 10000])
+def test_walk_nodes_scales_linearly(rungs):
+    """Benchmark the walk by counting parent expansions on a ladder of diamonds."""
+    tips = diamond_ladder(3 * rungs + 1, node_class=CountingNode)
+    CountingNode.expansions = 0
+    nodes = list(walk_nodes(tips))
+    assert len(nodes) == 3 * rungs + 1
+    assert CountingNode.expansions == len(nodes)
+
+
+def test_walk_nodes_deep_chain():
+    """Long linear chains do not hit the recursion limit."""
+    tips = linear_chain(50000)
+    assert len(list(walk_nodes(tips))) == 50000
+
+
+def test_sort_in_topological_order():
+    """Children always come before their parents."""
+    nodes = list(walk_nodes(diamond_ladder(151)))
+    position = {node: i for i, node in enumerate(sort_in_topological_order(nodes))}
+    assert len(position) == len(nodes)
+    for node in nodes:
+        for parent in node.parents:
+            assert position[node] < position[parent]
+
+
+def test_show_nodes_diamond_ladder():
+    """A ladder too deep to walk recursively still renders."""
+    out = io.StringIO()
+    Graph(fh=out, use_color=False).show_nodes(diamond_ladder(6001))
+    lines = out.getvalue().splitlines()
+    assert lines[:4] == ["*   merge 1999", "|\\  ", "* | left 1999", "| * right 1999"]
+    assert lines[-1] == "* root"
+
+
+def test_walk_nodes_first_parent():
+    """Only the first-parent history is walked in first-parent mode."""
+    tips = diamond_ladder(301, node_class=CountingNode)
+    CountingNode.expansions = 0
+    nodes = list(walk_nodes(tips, first_parent_only=True))
+    assert [node.item for node in nodes[:3]] == ["merge 99", "left 99", "merge 98"]
+    assert len(nodes) == 201
+    assert CountingNode.expansions == 201
+    assert [node.item for node in sort_in_topological_order(nodes, first_parent_only=True)] == [
+        node.item for node in nodes]
+
+
+def test_generation_numbers():
+    """Every node has a greater generation than its parents."""
+    tips = diamond_ladder(31)
+    generations = generation_numbers(tips)
+    assert generations[tips[0]] == 21
+    for node, generation in generations.items():
+        assert generation == 1 + max([generations[parent] for parent in node.parents] or [0])
+
+
+@pytest.mark.parametrize("seed", range(10))
+@pytest.mark.parametrize("first_parent_only", [False, True])
+def test_sort_in_key_order(random_dag, seed, first_parent_only):
+    """Of the nodes ready, the one with the highest key comes next, ties in given order."""
+    rnd = random.Random(seed)
+    nodes = list(walk_nodes(random_dag(200, seed), first_parent_only))
+    keys = {node: rnd.randrange(20) for node in nodes}
+    calls = []
+    key = lambda node: calls.append(node) or keys[node]  # noqa: E731
+
+    remaining = list(nodes)
+    expected = []
+    while remaining:
+        children = set(child for child in remaining for child in child.parents[:1 if first_parent_only else None])
+        ready = [node for node in remaining if node not in children]
+        best = max(ready, key=keys.get)
+        expected.append(best)
+        remaining.remove(best)
+    assert list(sort_in_topological_order(nodes, first_parent_only, key=key)) == expected
+    assert len(calls) == len(nodes)
+    assert list(sort_in_key_order(nodes, keys.get, first_parent_only)) == expected
+
+
+def test_sort_in_key_order_ignores_outside_parents():
+    """Parents which are not being sorted do not hold back their children."""
+    root = Node("root")
+    left = Node("left", parents=[root])
+    right = Node("right", parents=[root])
+    order = sort_in_key_order([left, right], key=lambda node: node.item)
+    assert [node.item for node in order] == ["right", "left"]
+
+
+@pytest.mark.parametrize("seed", range(20))
+@pytest.mark.parametrize("first_parent_only", [False, True])
+def test_incremental_topological_order(random_dag, seed, first_parent_only):
+    """The incremental order is the same as the full sort."""
+    tips = random_dag(200, seed)
+    expected = sort_in_topological_order(list(walk_nodes(tips, first_parent_only)), first_parent_only)
+    actual = incremental_topological_order(tips, generation_numbers(tips), first_parent_only)
+    assert list(actual) == list(expected)
+
+
+def test_incremental_topological_order_is_lazy():
+    """Taking the first few nodes only explores the DAG near them."""
+    tips = diamond_ladder(3001, node_class=CountingNode)
+    generations = generation_numbers(tips)
+    CountingNode.expansions = 0
+    first = list(islice(incremental_topological_order(tips, generations), 10))
+    assert [node.item for node in first[:4]] == ["merge 999", "left 999", "right 999", "merge 998"]
+    assert CountingNode.expansions < 30
+
+
+def test_weakly_connected_components():
+    """Tips sharing any ancestor are grouped together, in order of first tip."""
+    first, second = linear_chain(3), diamond_ladder(7)
+    left = second[0].parents[0]
+    merged = Node("merged", parents=[first[0], Node("other")])
+    tips = [second[0], first[0], left, merged, Node("alone")]
+    components = weakly_connected_components(tips)
+    assert components == [[second[0], left], [first[0], merged], [tips[-1]]]
+    assert weakly_connected_components(tips, first_parent_only=True) == [
+        [second[0], left], [first[0], merged], [tips[-1]]]
+    assert weakly_connected_components([Node("other-parent", parents=[Node("a"), first[0]]), first[0]],
+                                       first_parent_only=True)[1] == [first[0]]
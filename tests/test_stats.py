@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""Tests the stats module."""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import io
+import re
+
+from asciidag.graph import Graph
+from asciidag.node import Node
+from asciidag.sequence import generation_numbers
+
+
+def test_disabled():
+    """Test that without stats no methods are wrapped."""
+    graph = Graph(use_color=False)
+    assert graph.stats is None
+    assert not set(vars(graph)) & {'_output_commit_line', '_update', '_write_lines', '_walk'}
+
+
+def test_counts(tangled_nodes):
+    """Test that rows, peaks and bytes match the output."""
+    out = io.StringIO()
+    graph = Graph(fh=out, stats=True)
+    graph.show_nodes(tangled_nodes)
+    text = out.getvalue()
+    stats = graph.stats.as_dict()
+
+    assert sum(stats['rows'].values()) == text.count('\n')
+    assert stats['rows']['COMMIT'] == 20
+    assert stats['rows']['POST_MERGE'] == 6
+    assert stats['rows']['PRE_COMMIT'] == 2
+    assert stats['rows']['COLLAPSING'] > 0
+    assert stats['rows']['SKIP'] == 0
+    assert stats['bytes_written'] == len(text)
+    assert stats['escape_bytes'] == sum(len(code) for code in re.findall('\x1b\\[[0-9;]*m', text))
+    assert stats['peak_num_columns'] == 5
+    assert stats['peak_mapping_size'] >= 2 * stats['peak_num_columns'] - 1
+    assert set(stats['seconds']) == {
+        'walk', 'sort', '_output_padding_line', '_output_skip_line', '_output_pre_commit_line',
+        '_output_commit_line', '_output_post_merge_line', '_output_collapsing_line'}
+    assert stats['seconds']['_output_commit_line'] > 0
+
+    plain = io.StringIO()
+    Graph(fh=plain).show_nodes(tangled_nodes)
+    assert text == plain.getvalue()
+
+
+def test_octopus_and_incremental():
+    """Test pre-commit rows and lazily timed incremental sorting."""
+    base = Node('base')
+    octopus = Node('octopus', parents=[Node('a', parents=[base]), Node('b', parents=[base]), Node('c', parents=[base])])
+    tip = Node('tip', parents=[octopus, Node('left', parents=[base])])
+    graph = Graph(fh=io.StringIO(), use_color=False, stats=True)
+    graph.show_nodes([tip], generations=generation_numbers([tip]))
+    stats = graph.stats.as_dict()
+    assert stats['rows']['PRE_COMMIT'] == 2
+    assert stats['escape_bytes'] == 0
+    assert stats['seconds']['walk'] == 0
+    assert stats['seconds']['sort'] > 0
+
+
+def test_encoded_bytes():
+    """Test that bytes are counted in the encoding of the file handle."""
+    tip = Node.from_list('café', 'naïve')
+    for encoding in ('utf-8', 'utf-16-le'):
+        raw = io.BytesIO()
+        out = io.TextIOWrapper(raw, encoding=encoding)
+        graph = Graph(fh=out, use_color=False, stats=True)
+        graph.show_nodes([tip])
+        out.flush()
+        assert graph.stats.bytes_written == len(raw.getvalue())
+
+
+def test_sort_stays_lazy(tangled_nodes):
+    """Test that timing the sort does not consume it ahead of the render."""
+    graph = Graph(fh=io.StringIO(), stats=True)
+    consumed = []
+
+    class Nodes(list):
+        """List that records when it is iterated over."""
+
+        def __iter__(self):
+            """Record the iteration."""
+            consumed.append(True)
+            return super(Nodes, self).__iter__()
+
+    sorted_nodes = graph._sort(Nodes(tangled_nodes))  # pylint: disable=protected-access
+    assert not consumed
+    assert next(iter(sorted_nodes)) is tangled_nodes[0]
+    assert consumed